@@ -1,30 +1,273 @@
-from fastapi import APIRouter, Depends
-from stockfish import Stockfish
+import json
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
 
-from app.util.execute import execute_move, execute_strategy
-from app.util.fish.get_fish import get_stockfish
-from app.util.schema import ChessMove, MoveOutcome, StrategyRequest
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.status import (
+    HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    HTTP_422_UNPROCESSABLE_ENTITY,
+)
+
+from app.config.log import logger
+from app.util.execute import (
+    execute_move,
+    execute_pooled_strategy,
+    execute_strategies,
+    needs_stockfish_search,
+    stream_strategy,
+)
+from app.util.executor import run_blocking
+from app.util.fish.analysis import (
+    analyze_position,
+    get_cached_analysis,
+    stream_analysis,
+    to_candidate_move,
+)
+from app.util.fish.init_fish import (
+    EngineCheckout,
+    checkout_stockfish,
+    get_engine_checkout,
+    get_pool_checkout,
+)
+from app.util.fish.scheduler import EngineBusyError
+from app.util.fish.uci import SearchInfo, UciEngine
+from app.util.helper import STOCKFISH_SEARCH_LIMITS
+from app.util.schema import (
+    AnalysisMessage,
+    AnalysisOutcome,
+    AnalysisRequest,
+    BatchMoveOutcome,
+    ChessMove,
+    MoveOutcome,
+    StrategyName,
+    StrategyRequest,
+)
+from app.util.settings import api_settings
+from app.util.speculation import execute_move_and_speculate, pop_speculative_move
 
 chess_router = APIRouter(tags=["chess"])
 
+# One JSON message per line, candidate moves first and the final analysis last
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
 
-@chess_router.post("/compute_move", response_model=MoveOutcome)
-async def compute_move(
-    strategy_request: StrategyRequest,
-    stockfish: Stockfish = Depends(get_stockfish),
-) -> MoveOutcome:
-    return execute_strategy(
-        strategy_request=strategy_request,
-        stockfish=stockfish,
+
+def get_busy_exception(*, error: EngineBusyError) -> HTTPException:
+    return HTTPException(
+        status_code=error.status_code,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)},
     )
 
 
+@chess_router.post("/compute_move", response_model=MoveOutcome)
+async def compute_move(strategy_request: StrategyRequest) -> MoveOutcome:
+    # Checked before taking an engine, a precomputed reply needs none
+    speculative_move = await pop_speculative_move(strategy_request=strategy_request)
+
+    if speculative_move is not None:
+        return speculative_move
+
+    try:
+        return await execute_pooled_strategy(strategy_request=strategy_request)
+    except EngineBusyError as error:
+        raise get_busy_exception(error=error) from error
+
+
+@chess_router.post("/compute_moves", response_model=list[BatchMoveOutcome])
+async def compute_moves(
+    strategy_requests: list[StrategyRequest],
+) -> list[BatchMoveOutcome]:
+    if len(strategy_requests) > api_settings.max_batch_size:
+        raise HTTPException(
+            status_code=HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Too many positions in batch",
+        )
+
+    return await execute_strategies(strategy_requests=strategy_requests)
+
+
 @chess_router.post("/process_move", response_model=MoveOutcome)
 async def process_move(
     chess_move: ChessMove,
     strategy_request: StrategyRequest,
+    speculate: bool = False,
 ) -> MoveOutcome:
-    return execute_move(
+    if speculate:
+        return await execute_move_and_speculate(
+            chess_move=chess_move,
+            strategy_request=strategy_request,
+        )
+
+    return await run_blocking(
+        execute_move,
         chess_move=chess_move,
         strategy_request=strategy_request,
     )
+
+
+async def enter_engine_checkout(
+    *,
+    strategy_name: StrategyName,
+    fen_string: str,
+) -> tuple[AsyncExitStack, UciEngine]:
+    # Taken before a streaming response starts, so a busy engine is still a 429
+    engine_stack = AsyncExitStack()
+
+    try:
+        stockfish = await engine_stack.enter_async_context(
+            checkout_stockfish(strategy_name=strategy_name, fen_string=fen_string)
+        )
+    except EngineBusyError as error:
+        raise get_busy_exception(error=error) from error
+
+    return engine_stack, stockfish
+
+
+def to_analysis_line(*, analysis_message: AnalysisMessage) -> str:
+    return f"{analysis_message.json()}\n"
+
+
+async def stream_analysis_lines(
+    *,
+    engine_stack: AsyncExitStack,
+    stockfish: UciEngine,
+    analysis_request: AnalysisRequest,
+) -> AsyncIterator[str]:
+    # The engine stays checked out until the last line is sent or the client leaves
+    async with engine_stack:
+        async for analysis_update in stream_analysis(
+            stockfish=stockfish,
+            analysis_request=analysis_request,
+        ):
+            yield to_analysis_line(
+                analysis_message=(
+                    AnalysisMessage(analysis_outcome=analysis_update)
+                    if isinstance(analysis_update, AnalysisOutcome)
+                    else AnalysisMessage(candidate_move=analysis_update)
+                )
+            )
+
+
+async def stream_cached_analysis(
+    *,
+    analysis_outcome: AnalysisOutcome,
+) -> AsyncIterator[str]:
+    yield to_analysis_line(
+        analysis_message=AnalysisMessage(analysis_outcome=analysis_outcome)
+    )
+
+
+@chess_router.post("/analyze_position", response_model=AnalysisOutcome)
+async def analyze(
+    analysis_request: AnalysisRequest,
+    stream: bool = False,
+) -> AnalysisOutcome | StreamingResponse:
+    if analysis_request.strategy_name not in STOCKFISH_SEARCH_LIMITS:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Analysis needs a Stockfish strategy",
+        )
+
+    if analysis_request.multipv > api_settings.max_multipv:
+        raise HTTPException(
+            status_code=HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Too many principal variations",
+        )
+
+    analysis_outcome = get_cached_analysis(analysis_request=analysis_request)
+
+    if analysis_outcome is not None:
+        if stream:
+            return StreamingResponse(
+                stream_cached_analysis(analysis_outcome=analysis_outcome),
+                media_type=NDJSON_MEDIA_TYPE,
+            )
+
+        return analysis_outcome
+
+    if stream:
+        engine_stack, stockfish = await enter_engine_checkout(
+            strategy_name=analysis_request.strategy_name,
+            fen_string=analysis_request.fen_string,
+        )
+
+        return StreamingResponse(
+            stream_analysis_lines(
+                engine_stack=engine_stack,
+                stockfish=stockfish,
+                analysis_request=analysis_request,
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+
+    try:
+        # The checkout sees a failed search, so the pool restarts its engine
+        async with checkout_stockfish(
+            strategy_name=analysis_request.strategy_name,
+            fen_string=analysis_request.fen_string,
+        ) as stockfish:
+            return await analyze_position(
+                stockfish=stockfish,
+                analysis_request=analysis_request,
+            )
+    except EngineBusyError as error:
+        raise get_busy_exception(error=error) from error
+
+
+def to_event(*, event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def stream_move_events(
+    *,
+    engine_stack: AsyncExitStack,
+    engine_checkout: EngineCheckout,
+    strategy_request: StrategyRequest,
+) -> AsyncIterator[str]:
+    # A client that disconnects cancels the stream, which stops the search and
+    # returns the engine to the pool
+    async with engine_stack:
+        try:
+            async for move_update in stream_strategy(
+                strategy_request=strategy_request,
+                engine_checkout=engine_checkout,
+            ):
+                if isinstance(move_update, SearchInfo):
+                    if move_update.pv:
+                        yield to_event(
+                            event="info",
+                            data=to_candidate_move(search_info=move_update).json(),
+                        )
+                    continue
+
+                yield to_event(event="move_outcome", data=move_update.json())
+        except Exception as error:
+            logger.warning(f"Move stream failed: {error}")
+            yield to_event(event="error", data=json.dumps({"detail": str(error)}))
+
+
+@chess_router.post("/stream_move")
+async def stream_move(strategy_request: StrategyRequest) -> StreamingResponse:
+    if await needs_stockfish_search(strategy_request=strategy_request):
+        engine_stack, stockfish = await enter_engine_checkout(
+            strategy_name=strategy_request.strategy_name,
+            fen_string=strategy_request.fen_string,
+        )
+        engine_checkout = get_engine_checkout(stockfish=stockfish)
+    else:
+        # Known moves need no engine, other strategies only take one if they
+        # fall back to a search
+        engine_stack = AsyncExitStack()
+        engine_checkout = get_pool_checkout(fen_string=strategy_request.fen_string)
+
+    return StreamingResponse(
+        stream_move_events(
+            engine_stack=engine_stack,
+            engine_checkout=engine_checkout,
+            strategy_request=strategy_request,
+        ),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache"},
+    )
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from starlette.status import WS_1008_POLICY_VIOLATION
+
+from app.util.game_session import GameSession
+from app.util.schema import GameMessage, StrategyRequest
+
+game_router = APIRouter(tags=["game"])
+
+
+@game_router.websocket("/game")
+async def play_game(websocket: WebSocket) -> None:
+    await websocket.accept()
+
+    try:
+        try:
+            game_session = GameSession(
+                strategy_request=StrategyRequest.parse_obj(
+                    await websocket.receive_json()
+                ),
+            )
+        except (ValidationError, ValueError):
+            await websocket.close(code=WS_1008_POLICY_VIOLATION)
+            return
+
+        while True:
+            message = await websocket.receive_text()
+
+            try:
+                move_outcome = await game_session.play(message=message.strip())
+            except Exception as error:
+                await websocket.send_json(GameMessage(error=str(error)).dict())
+                continue
+
+            await websocket.send_json(GameMessage(move_outcome=move_outcome).dict())
+    except WebSocketDisconnect:
+        pass
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+
+from app.util.board_cache import board_cache
+from app.util.fish.move_cache import stockfish_cache
+from app.util.metrics import CONTENT_TYPE, record_cache_stats, render_metrics
+from app.util.speculation import speculative_moves
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+
+@metrics_router.get("/metrics")
+async def metrics() -> Response:
+    record_cache_stats(cache_name="stockfish", stats=stockfish_cache.stats())
+    record_cache_stats(cache_name="board", stats=board_cache.stats())
+    record_cache_stats(cache_name="speculative_move", stats=speculative_moves.stats())
+
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
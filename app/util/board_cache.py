@@ -0,0 +1,17 @@
+from chess import Board
+
+from app.util.cache import LruCache
+from app.util.settings import api_settings
+
+board_cache: LruCache[str, Board] = LruCache(capacity=api_settings.board_cache_size)
+
+
+def get_board(*, fen_string: str) -> Board:
+    board = board_cache.get(fen_string)
+
+    if board is None:
+        board = Board(fen=fen_string)
+        board_cache.set(fen_string, board)
+
+    # Cached boards are shared, callers get a copy they are free to push moves on
+    return board.copy(stack=False)
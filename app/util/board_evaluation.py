@@ -1,105 +1,169 @@
 from collections.abc import Callable
 
 from chess import (
+    BB_DARK_SQUARES,
+    BB_LIGHT_SQUARES,
+    BB_SQUARES,
     BLACK,
+    PAWN,
     PIECE_SYMBOLS,
+    PIECE_TYPES,
     SQUARES,
     WHITE,
+    Bitboard,
     Board,
     Color,
     Move,
-    Piece,
+    PieceType,
     Square,
-    square_file,
-    square_rank,
+    SquareSet,
+    scan_forward,
 )
 
 from app.util.schema import MoveEvaluation
 
+try:
+    import numpy as np
+except ImportError:
+    np = None  # type: ignore[assignment]
+
 PIECE_VALUES = {None: 0, "p": 1, "n": 3, "b": 3, "r": 5, "q": 9, "k": 100}
+PIECE_TYPE_VALUES = {
+    piece_type: PIECE_VALUES[PIECE_SYMBOLS[piece_type]] for piece_type in PIECE_TYPES
+}
 
+WHITE_SQUARES = BB_LIGHT_SQUARES
+BLACK_SQUARES = BB_DARK_SQUARES
+SQUARE_COLORS = [
+    WHITE if WHITE_SQUARES & BB_SQUARES[square] else BLACK for square in SQUARES
+]
 
-def get_piece_value(*, piece: Piece) -> int:
-    piece_symbol = piece.symbol().lower()
 
-    if piece_symbol in PIECE_SYMBOLS:
-        return PIECE_VALUES[piece_symbol]
+def evaluate_board(*, board: Board, player_color: Color) -> int:
+    return sum(
+        piece_value
+        * (
+            board.pieces_mask(piece_type, player_color).bit_count()
+            - board.pieces_mask(piece_type, not player_color).bit_count()
+        )
+        for piece_type, piece_value in PIECE_TYPE_VALUES.items()
+    )
 
-    raise Exception("Invalid piece")
 
+# One bitboard per piece type and color, white pieces first
+PackedBoard = tuple[Bitboard, ...]
 
-def get_piece_value_for_player(*, piece: Piece, player_color: Color) -> int:
-    piece_symbol = piece.symbol().lower()
+PACKED_PIECES = [
+    (piece_type, color) for color in (WHITE, BLACK) for piece_type in PIECE_TYPES
+]
+# Material of each packed bitboard from white's perspective
+PACKED_VALUES = [
+    PIECE_TYPE_VALUES[piece_type] if color == WHITE else -PIECE_TYPE_VALUES[piece_type]
+    for piece_type, color in PACKED_PIECES
+]
 
-    if piece_symbol in PIECE_SYMBOLS:
-        if piece.color == player_color:
-            return get_piece_value(piece=piece)
+if np is not None:
+    BYTE_BIT_COUNTS = np.array([bin(byte).count("1") for byte in range(256)])
+    PACKED_VALUE_ARRAY = np.array(PACKED_VALUES)
 
-        return -get_piece_value(piece=piece)
 
-    raise Exception("Invalid piece")
+def pack_board(*, board: Board) -> PackedBoard:
+    return tuple(
+        board.pieces_mask(piece_type, color) for piece_type, color in PACKED_PIECES
+    )
 
 
-def evaluate_board(*, board: Board, player_color: Color) -> int:
-    value = 0
+def evaluate_packed_boards(
+    *,
+    packed_boards: list[PackedBoard],
+    player_color: Color,
+) -> list[int]:
+    """evaluate_board for many positions, vectorized when NumPy is installed"""
+
+    sign = 1 if player_color == WHITE else -1
+
+    if np is None or not packed_boards:
+        return [
+            sign
+            * sum(
+                value * bitboard.bit_count()
+                for value, bitboard in zip(PACKED_VALUES, packed_board)
+            )
+            for packed_board in packed_boards
+        ]
+
+    bitboards = np.array(packed_boards, dtype=np.uint64)
+    # Count the bits of every byte, then add up the 8 bytes of each bitboard
+    bit_counts = (
+        BYTE_BIT_COUNTS[bitboards.view(np.uint8)]
+        .reshape(len(packed_boards), len(PACKED_PIECES), 8)
+        .sum(axis=2)
+    )
 
-    for square in range(64):
-        piece = board.piece_at(square=square)
+    return (sign * (bit_counts @ PACKED_VALUE_ARRAY)).tolist()
 
-        if piece is not None:
-            value += get_piece_value_for_player(piece=piece, player_color=player_color)
 
-    return value
+def pack_board_after_move(*, board: Board, move: Move) -> PackedBoard:
+    board.push(move)
+
+    try:
+        return pack_board(board=board)
+    finally:
+        board.pop()
+
+
+def get_captured_piece_type(*, board: Board, move: Move) -> PieceType | None:
+    if board.is_en_passant(move):
+        return PAWN
+
+    if board.occupied_co[not board.turn] & BB_SQUARES[move.to_square]:
+        return board.piece_type_at(move.to_square)
+
+    return None
+
 
+def get_move_value_delta(*, board: Board, move: Move) -> int:
+    """Material the side to move gains by playing the move"""
 
-def simulate_move_and_evaluate(*, board: Board, move: Move) -> int:
-    hypothetical_board = board.copy(stack=False)
-    hypothetical_board.push(move=move)
-    return evaluate_board(board=hypothetical_board, player_color=board.turn)
+    value = 0
+
+    captured_piece_type = get_captured_piece_type(board=board, move=move)
+    if captured_piece_type is not None:
+        value += PIECE_TYPE_VALUES[captured_piece_type]
+
+    if move.promotion is not None:
+        value += PIECE_TYPE_VALUES[move.promotion] - PIECE_TYPE_VALUES[PAWN]
+
+    return value
 
 
 def is_square_under_attack(*, board: Board, square: int, player_color: bool) -> bool:
     return board.is_attacked_by(color=not player_color, square=square)
 
 
-def get_pieces_under_attack(*, board: Board, player_color: bool) -> list[int]:
-    return [
+def get_pieces_under_attack(*, board: Board, player_color: bool) -> SquareSet:
+    # Only squares holding the player's pieces can be attacked pieces
+    return SquareSet(
         square
-        for square in SQUARES
+        for square in scan_forward(board.occupied_co[player_color])
         if is_square_under_attack(board=board, square=square, player_color=player_color)
-        and is_players_piece_on_square(
-            board=board,
-            square=square,
-            player_color=player_color,
-        )
-    ]
+    )
 
 
 def count_opponent_pieces(*, board: Board, player_color: Color) -> int:
-    return sum(
-        1
-        for square in SQUARES
-        if (piece := board.piece_at(square=square)) and piece.color != player_color
-    )
+    return board.occupied_co[not player_color].bit_count()
 
 
 def is_white_square(*, square: Square) -> bool:
-    return (square_file(square) + square_rank(square)) % 2 != 0
+    return bool(WHITE_SQUARES & BB_SQUARES[square])
 
 
 def is_black_square(*, square: Square) -> bool:
-    return not is_white_square(square=square)
+    return bool(BLACK_SQUARES & BB_SQUARES[square])
 
 
 def get_square_color(*, square: Square) -> Color:
-    return WHITE if is_white_square(square=square) else BLACK
-
-
-def is_players_piece_on_square(
-    *, board: Board, square: int, player_color: bool
-) -> bool:
-    piece = board.piece_at(square=square)
-    return piece is not None and piece.color == player_color
+    return SQUARE_COLORS[square]
 
 
 def get_move_based_on_value(*, move_values: list[MoveEvaluation], fn: Callable) -> Move:
@@ -112,21 +176,35 @@ class NoMovesToEvaluateError(Exception):
     pass
 
 
+def get_move_values(*, board: Board, moves: list[Move], batch: bool) -> list[int]:
+    if batch:
+        return evaluate_packed_boards(
+            packed_boards=[
+                pack_board_after_move(board=board, move=move) for move in moves
+            ],
+            player_color=board.turn,
+        )
+
+    # Only captures and promotions change material, so every move is scored
+    # as a delta from the current position instead of on a board copy
+    base_value = evaluate_board(board=board, player_color=board.turn)
+
+    return [base_value + get_move_value_delta(board=board, move=move) for move in moves]
+
+
 def evaluate_and_get_optimal_move(
     *,
     board: Board,
     moves: list[Move],
     is_max: bool = True,
+    batch: bool = False,
 ) -> Move:
     move_values = [
-        MoveEvaluation(
-            move=move,
-            value=simulate_move_and_evaluate(
-                board=board,
-                move=move,
-            ),
+        MoveEvaluation(move=move, value=value)
+        for move, value in zip(
+            moves,
+            get_move_values(board=board, moves=moves, batch=batch),
         )
-        for move in moves
     ]
     if not move_values:
         raise NoMovesToEvaluateError
@@ -0,0 +1,43 @@
+import time
+from contextvars import ContextVar
+
+from app.util.settings import api_settings
+
+# Engine IPC and parsing time that a search needs on top of its movetime
+ENGINE_OVERHEAD_MS = 2
+
+# Monotonic time by which the current request has to be answered
+current_deadline: ContextVar[float | None] = ContextVar(
+    "current_deadline",
+    default=None,
+)
+
+
+def start_deadline(*, deadline_ms: int | None) -> None:
+    current_deadline.set(
+        None if deadline_ms is None else time.monotonic() + deadline_ms / 1000
+    )
+
+
+def get_remaining_ms() -> float | None:
+    deadline = current_deadline.get()
+
+    if deadline is None:
+        return None
+
+    return (deadline - time.monotonic()) * 1000
+
+
+def is_deadline_near() -> bool:
+    remaining_ms = get_remaining_ms()
+
+    return remaining_ms is not None and remaining_ms < api_settings.deadline_fallback_ms
+
+
+def get_deadline_movetime(*, movetime: int) -> int:
+    remaining_ms = get_remaining_ms()
+
+    if remaining_ms is None:
+        return movetime
+
+    return max(1, min(movetime, int(remaining_ms - ENGINE_OVERHEAD_MS)))
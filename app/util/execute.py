@@ -1,24 +1,49 @@
-from typing import Callable
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
 
-from chess import Board, Move, square_name
-from stockfish import Stockfish
+from chess import Board, Move, piece_symbol, square_name
 
+from app.config.log import logger
+from app.util.board_cache import get_board
 from app.util.board_evaluation import count_opponent_pieces
+from app.util.deadline import is_deadline_near, start_deadline
+from app.util.fish.init_fish import EngineCheckout, engine_scheduler, get_pool_checkout
+from app.util.fish.move_cache import get_stockfish_cache_key
+from app.util.fish.scheduler import EngineBusyError
+from app.util.fish.uci import SearchInfo
 from app.util.game_outcome import get_game_outcome
+from app.util.helper import STOCKFISH_SEARCH_LIMITS
+from app.util.metrics import (
+    current_strategy_name,
+    record_stockfish_fallback,
+    strategy_duration,
+    time_stage,
+)
 from app.util.move import (
+    choose_random_move,
     get_checkmate_express_move,
     get_dichrome_move,
     get_elusive_move,
+    get_known_stockfish_move,
     get_monochrome_move,
     get_predator_move,
     get_random_move,
-    get_stockfish_move,
     get_random_strategy_move,
+    get_stockfish_move,
+    stream_stockfish_move,
 )
-from app.util.schema import ChessMove, MoveOutcome, StrategyName, StrategyRequest
+from app.util.schema import (
+    BatchMoveOutcome,
+    ChessMove,
+    MoveOutcome,
+    StrategyName,
+    StrategyRequest,
+)
+from app.util.settings import api_settings
 
 STRATEGY_FUNCTIONS: dict[
-    StrategyName, tuple[Callable[[Stockfish, Board, float], MoveOutcome], float]
+    StrategyName,
+    tuple[Callable[[EngineCheckout, Board, str, float], Awaitable[MoveOutcome]], float],
 ] = {
     "random-move": (get_random_move, 0),
     "elusive": (get_elusive_move, 1 / 10),
@@ -30,75 +55,253 @@ STRATEGY_FUNCTIONS: dict[
 }
 
 
-def execute_strategy(
+async def get_strategy_move(
     *,
-    strategy_request: StrategyRequest,
-    stockfish: Stockfish,
+    board: Board,
+    fen_string: str,
+    strategy_name: StrategyName,
+    engine_checkout: EngineCheckout,
 ) -> MoveOutcome:
-    board = Board(fen=strategy_request.fen_string)
-
     game_outcome = get_game_outcome(board=board)
 
     if game_outcome is not None:
         return game_outcome
 
+    if is_deadline_near():
+        return choose_random_move(board=board)
+
     if (
-        not strategy_request.strategy_name.startswith("stockfish")
+        not strategy_name.startswith("stockfish")
         and count_opponent_pieces(board=board, player_color=board.turn) == 1
     ):
-        return get_stockfish_move(
-            stockfish=stockfish,
+        record_stockfish_fallback(reason="lone_king")
+        return await get_stockfish_move(
+            engine_checkout=engine_checkout,
             strategy_name="stockfish-10",
-            fen_string=strategy_request.fen_string,
+            fen_string=fen_string,
         )
 
-    if strategy_request.strategy_name.startswith("stockfish"):
-        return get_stockfish_move(
-            stockfish=stockfish,
-            strategy_name=strategy_request.strategy_name,
-            fen_string=strategy_request.fen_string,
+    if strategy_name.startswith("stockfish"):
+        return await get_stockfish_move(
+            engine_checkout=engine_checkout,
+            strategy_name=strategy_name,
+            fen_string=fen_string,
+            ponder=api_settings.stockfish_ponder,
         )
 
-    strategy_function, probability = STRATEGY_FUNCTIONS.get(
-        strategy_request.strategy_name, (None, 0)
-    )
+    strategy_function, probability = STRATEGY_FUNCTIONS.get(strategy_name, (None, 0))
 
     if strategy_function:
-        return strategy_function(stockfish, board, probability)
+        return await strategy_function(engine_checkout, board, fen_string, probability)
 
     raise Exception("Invalid strategy")
 
 
-def execute_move(
+async def compute_strategy_move(
+    *,
+    board: Board,
+    fen_string: str,
+    strategy_name: StrategyName,
+    engine_checkout: EngineCheckout,
+) -> MoveOutcome:
+    current_strategy_name.set(strategy_name)
+
+    with strategy_duration.time(strategy_name=strategy_name):
+        return await get_strategy_move(
+            board=board,
+            fen_string=fen_string,
+            strategy_name=strategy_name,
+            engine_checkout=engine_checkout,
+        )
+
+
+async def execute_strategy(
     *,
-    chess_move: ChessMove,
     strategy_request: StrategyRequest,
+    engine_checkout: EngineCheckout,
 ) -> MoveOutcome:
-    board = Board(fen=strategy_request.fen_string)
+    current_strategy_name.set(strategy_request.strategy_name)
+
+    with time_stage(stage="fen_parse"):
+        board = get_board(fen_string=strategy_request.fen_string)
+
+    return await compute_strategy_move(
+        board=board,
+        fen_string=strategy_request.fen_string,
+        strategy_name=strategy_request.strategy_name,
+        engine_checkout=engine_checkout,
+    )
+
+
+async def stream_strategy(
+    *,
+    strategy_request: StrategyRequest,
+    engine_checkout: EngineCheckout,
+) -> AsyncIterator[SearchInfo | MoveOutcome]:
+    """Like execute_strategy, with the progress of Stockfish searches"""
+    current_strategy_name.set(strategy_request.strategy_name)
+    board = get_board(fen_string=strategy_request.fen_string)
+
+    if (
+        strategy_request.strategy_name in STOCKFISH_SEARCH_LIMITS
+        and get_game_outcome(board=board) is None
+    ):
+        async for search_update in stream_stockfish_move(
+            engine_checkout=engine_checkout,
+            strategy_name=strategy_request.strategy_name,
+            fen_string=strategy_request.fen_string,
+        ):
+            yield search_update
+        return
+
+    # Other strategies have no progress to report, only their move
+    yield await execute_strategy(
+        strategy_request=strategy_request,
+        engine_checkout=engine_checkout,
+    )
+
+
+async def needs_stockfish_search(*, strategy_request: StrategyRequest) -> bool:
+    """Whether streaming the strategy searches, book and cached moves do not"""
+    if strategy_request.strategy_name not in STOCKFISH_SEARCH_LIMITS:
+        return False
+
+    try:
+        board = get_board(fen_string=strategy_request.fen_string)
+    except ValueError:
+        # The stream reports the invalid position without an engine
+        return False
+
+    if get_game_outcome(board=board) is not None:
+        return False
+
+    known_move = await get_known_stockfish_move(
+        strategy_name=strategy_request.strategy_name,
+        fen_string=strategy_request.fen_string,
+        cache_key=get_stockfish_cache_key(
+            fen_string=strategy_request.fen_string,
+            strategy_name=strategy_request.strategy_name,
+        ),
+    )
+
+    return known_move is None
+
 
+async def execute_pooled_strategy(
+    *,
+    strategy_request: StrategyRequest,
+) -> MoveOutcome:
+    current_strategy_name.set(strategy_request.strategy_name)
+    start_deadline(deadline_ms=strategy_request.deadline_ms)
+
+    try:
+        return await execute_strategy(
+            strategy_request=strategy_request,
+            engine_checkout=get_pool_checkout(fen_string=strategy_request.fen_string),
+        )
+    except EngineBusyError:
+        if not is_deadline_near():
+            raise
+
+    # The budget went into the queue, an answer now beats a good answer later
+    return execute_fallback_strategy(fen_string=strategy_request.fen_string)
+
+
+def execute_fallback_strategy(*, fen_string: str) -> MoveOutcome:
+    board = get_board(fen_string=fen_string)
+    game_outcome = get_game_outcome(board=board)
+
+    if game_outcome is not None:
+        return game_outcome
+
+    return choose_random_move(board=board)
+
+
+async def execute_batch_strategy(
+    *,
+    strategy_request: StrategyRequest,
+    batch_slots: asyncio.Semaphore,
+) -> BatchMoveOutcome:
+    try:
+        async with batch_slots:
+            move_outcome = await execute_pooled_strategy(
+                strategy_request=strategy_request,
+            )
+    except Exception as error:
+        logger.warning(f"Batch position failed: {error}")
+        return BatchMoveOutcome(error=str(error))
+
+    return BatchMoveOutcome(move_outcome=move_outcome)
+
+
+async def execute_strategies(
+    *,
+    strategy_requests: list[StrategyRequest],
+) -> list[BatchMoveOutcome]:
+    # A batch runs at most as many positions as there are search slots, the rest
+    # wait here instead of filling the engine queue ahead of interactive requests
+    batch_slots = asyncio.Semaphore(engine_scheduler.max_concurrent)
+
+    return await asyncio.gather(
+        *(
+            execute_batch_strategy(
+                strategy_request=strategy_request,
+                batch_slots=batch_slots,
+            )
+            for strategy_request in strategy_requests
+        )
+    )
+
+
+def get_legal_move(*, board: Board, move: Move) -> Move:
+    if board.is_legal(move):
+        return move
+
+    # Clients may send a promotion piece along with a move that does not promote
+    if move.promotion is not None:
+        move = Move(from_square=move.from_square, to_square=move.to_square)
+
+        if board.is_legal(move):
+            return move
+
+    raise Exception("Invalid move")
+
+
+def play_move(*, board: Board, chess_move: ChessMove) -> MoveOutcome:
     uci_string = "".join([chess_move.from_square, chess_move.to_square])
     if chess_move.promotion:
         uci_string = "".join([uci_string, chess_move.promotion])
 
-    move = Move.from_uci(uci=uci_string)
-
-    legal_move_ucis = [legal_move.uci() for legal_move in board.legal_moves]
-
-    if move.uci() not in legal_move_ucis and move.uci()[0:4] not in legal_move_ucis:
-        raise Exception("Invalid move")
+    move = get_legal_move(board=board, move=Move.from_uci(uci=uci_string))
 
     board.push(move)
 
+    fen_string = board.fen()
     game_outcome = get_game_outcome(board=board)
 
     if game_outcome is not None:
-        return game_outcome
+        return MoveOutcome(
+            game_outcome=game_outcome.game_outcome,
+            fen_string=fen_string,
+        )
 
     return MoveOutcome(
         chess_move=ChessMove(
             from_square=square_name(square=move.from_square),
             to_square=square_name(square=move.to_square),
-            promotion=chess_move.promotion,
+            promotion=piece_symbol(move.promotion) if move.promotion else None,
         ),
         game_outcome=None,
+        fen_string=fen_string,
+    )
+
+
+def execute_move(
+    *,
+    chess_move: ChessMove,
+    strategy_request: StrategyRequest,
+) -> MoveOutcome:
+    return play_move(
+        board=get_board(fen_string=strategy_request.fen_string),
+        chess_move=chess_move,
     )
@@ -0,0 +1,23 @@
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from typing import ParamSpec, TypeVar
+
+from app.util.settings import api_settings
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+strategy_executor = ThreadPoolExecutor(
+    max_workers=api_settings.strategy_workers,
+    thread_name_prefix="strategy",
+)
+
+
+async def run_blocking(fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    loop = asyncio.get_running_loop()
+    # Like asyncio.to_thread, the worker sees the caller's context variables
+    call: Callable[[], T] = partial(fn, *args, **kwargs)
+    return await loop.run_in_executor(strategy_executor, copy_context().run, call)
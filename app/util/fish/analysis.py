@@ -0,0 +1,106 @@
+from collections.abc import AsyncIterator
+
+from app.util.board_cache import get_board
+from app.util.cache import LruCache
+from app.util.fish.move_cache import get_stockfish_cache_key
+from app.util.fish.uci import SearchInfo, UciEngine
+from app.util.game_outcome import get_game_outcome
+from app.util.helper import get_search_limit_for_stockfish_strategy, parse_move
+from app.util.schema import (
+    AnalysisOutcome,
+    AnalysisRequest,
+    CandidateMove,
+    StrategyName,
+)
+from app.util.settings import api_settings
+
+AnalysisCacheKey = tuple[str, StrategyName, int]
+
+analysis_cache: LruCache[AnalysisCacheKey, AnalysisOutcome] = LruCache(
+    capacity=api_settings.stockfish_cache_size,
+    ttl=api_settings.stockfish_cache_ttl,
+)
+
+
+def get_analysis_cache_key(*, analysis_request: AnalysisRequest) -> AnalysisCacheKey:
+    fen_string, strategy_name = get_stockfish_cache_key(
+        fen_string=analysis_request.fen_string,
+        strategy_name=analysis_request.strategy_name,
+    )
+
+    return fen_string, strategy_name, analysis_request.multipv
+
+
+def to_candidate_move(*, search_info: SearchInfo) -> CandidateMove:
+    chess_move = parse_move(move_uci=search_info.pv[0]).chess_move
+
+    if chess_move is None:
+        raise Exception("Invalid best move")
+
+    return CandidateMove(
+        rank=search_info.multipv,
+        depth=search_info.depth,
+        score_cp=search_info.score_cp,
+        score_mate=search_info.score_mate,
+        chess_move=chess_move,
+        pv=list(search_info.pv),
+    )
+
+
+def get_cached_analysis(*, analysis_request: AnalysisRequest) -> AnalysisOutcome | None:
+    board = get_board(fen_string=analysis_request.fen_string)
+    game_outcome = get_game_outcome(board=board)
+
+    if game_outcome is not None:
+        return AnalysisOutcome(game_outcome=game_outcome.game_outcome)
+
+    return analysis_cache.get(get_analysis_cache_key(analysis_request=analysis_request))
+
+
+async def stream_analysis(
+    *,
+    stockfish: UciEngine,
+    analysis_request: AnalysisRequest,
+) -> AsyncIterator[CandidateMove | AnalysisOutcome]:
+    """Yield candidate moves as the search deepens, then the final analysis"""
+    # Latest line per rank, a deeper iteration replaces the previous one
+    candidate_moves: dict[int, CandidateMove] = {}
+
+    async for search_update in stockfish.analyze(
+        fen_string=analysis_request.fen_string,
+        search_limit=get_search_limit_for_stockfish_strategy(
+            strategy=analysis_request.strategy_name
+        ),
+        multipv=analysis_request.multipv,
+    ):
+        # The best move itself is the first move of the top ranked line
+        if not isinstance(search_update, SearchInfo) or not search_update.pv:
+            continue
+
+        candidate_move = to_candidate_move(search_info=search_update)
+        candidate_moves[candidate_move.rank] = candidate_move
+        yield candidate_move
+
+    analysis_outcome = AnalysisOutcome(
+        candidate_moves=[candidate_moves[rank] for rank in sorted(candidate_moves)]
+    )
+    analysis_cache.set(
+        get_analysis_cache_key(analysis_request=analysis_request),
+        analysis_outcome,
+    )
+    yield analysis_outcome
+
+
+async def analyze_position(
+    *,
+    stockfish: UciEngine,
+    analysis_request: AnalysisRequest,
+) -> AnalysisOutcome:
+    async for analysis_update in stream_analysis(
+        stockfish=stockfish,
+        analysis_request=analysis_request,
+    ):
+        if isinstance(analysis_update, AnalysisOutcome):
+            return analysis_update
+
+    raise Exception("No analysis found")
@@ -0,0 +1,33 @@
+from chess import Board, Move
+from chess.polyglot import MemoryMappedReader, open_reader
+
+from app.util.schema import StrategyName
+from app.util.settings import api_settings
+
+# Deep tiers always play the main line, the rest vary by book weight
+BEST_BOOK_MOVE_STRATEGIES: set[StrategyName] = {"stockfish-500", "stockfish-1000"}
+
+
+def open_opening_book() -> MemoryMappedReader | None:
+    if api_settings.opening_book_path is None:
+        return None
+
+    return open_reader(api_settings.opening_book_path)
+
+
+def get_book_move(
+    *,
+    book: MemoryMappedReader,
+    board: Board,
+    strategy_name: StrategyName,
+) -> Move | None:
+    try:
+        if strategy_name in BEST_BOOK_MOVE_STRATEGIES:
+            return book.find(board).move
+
+        return book.weighted_choice(board).move
+    except IndexError:
+        return None
+
+
+opening_book = open_opening_book()
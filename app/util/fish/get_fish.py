@@ -1,7 +0,0 @@
-from stockfish import Stockfish
-
-from app.util.fish.init_fish import stockfish
-
-
-def get_stockfish() -> Stockfish:
-    return stockfish
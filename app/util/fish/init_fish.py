@@ -1,11 +1,24 @@
 import os
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
 
-from stockfish import Stockfish
-
+from app.util.deadline import get_remaining_ms
+from app.util.fish.pool import StockfishPool
+from app.util.fish.scheduler import EngineScheduler
+from app.util.fish.uci import UciEngine
+from app.util.helper import get_strategy_movetime
+from app.util.schema import StrategyName
 from app.util.settings import api_settings
 
+# Hands out an engine for a search of the given strategy, strategies take one
+# only when they actually search
+EngineCheckout = Callable[[StrategyName], AbstractAsyncContextManager[UciEngine]]
+
 
 def get_stockfish_path() -> str:
+    if api_settings.stockfish_path is not None:
+        return api_settings.stockfish_path
+
     return (
         os.path.join(os.path.dirname(__file__), "stockfish")
         if api_settings.is_local
@@ -13,5 +26,60 @@ def get_stockfish_path() -> str:
     )
 
 
-stockfish = Stockfish(path=get_stockfish_path())
-stockfish.set_skill_level(20)
+async def init_stockfish() -> UciEngine:
+    stockfish = UciEngine(
+        path=get_stockfish_path(),
+        options={
+            "Skill Level": 20,
+            "Threads": api_settings.stockfish_threads,
+            "Hash": api_settings.stockfish_hash,
+        },
+    )
+    await stockfish.start()
+    return stockfish
+
+
+stockfish_pool = StockfishPool(
+    size=api_settings.stockfish_pool_size,
+    init_stockfish=init_stockfish,
+)
+
+# Engine work of one worker, defaults to one search per pooled engine
+engine_scheduler = EngineScheduler(
+    max_concurrent=api_settings.max_concurrent_searches
+    or api_settings.stockfish_pool_size,
+    queue_size=api_settings.engine_queue_size,
+    queue_timeout=api_settings.engine_queue_timeout,
+)
+
+
+@asynccontextmanager
+async def checkout_stockfish(
+    *,
+    strategy_name: StrategyName,
+    fen_string: str,
+) -> AsyncIterator[UciEngine]:
+    remaining_ms = get_remaining_ms()
+
+    # Admission happens before taking an engine, so the pool never sees a backlog
+    async with engine_scheduler.admit(
+        movetime=get_strategy_movetime(strategy_name=strategy_name),
+        timeout=None if remaining_ms is None else max(0, remaining_ms / 1000),
+    ), stockfish_pool.checkout(fen_string=fen_string) as stockfish:
+        yield stockfish
+
+
+def get_pool_checkout(*, fen_string: str) -> EngineCheckout:
+    def checkout(strategy_name: StrategyName) -> AbstractAsyncContextManager[UciEngine]:
+        return checkout_stockfish(strategy_name=strategy_name, fen_string=fen_string)
+
+    return checkout
+
+
+def get_engine_checkout(*, stockfish: UciEngine) -> EngineCheckout:
+    # For callers that already hold an engine
+    @asynccontextmanager
+    async def checkout(_strategy_name: StrategyName) -> AsyncIterator[UciEngine]:
+        yield stockfish
+
+    return checkout
@@ -0,0 +1,63 @@
+from app.util.cache import LruCache
+from app.util.executor import run_blocking, strategy_executor
+from app.util.helper import get_position_key
+from app.util.schema import StrategyName
+from app.util.settings import api_settings
+from app.util.shared_cache import shared_cache
+
+stockfish_cache: LruCache[tuple[str, StrategyName], str] = LruCache(
+    capacity=api_settings.stockfish_cache_size,
+    ttl=api_settings.stockfish_cache_ttl,
+)
+
+
+def get_stockfish_cache_key(
+    *,
+    fen_string: str,
+    strategy_name: StrategyName,
+) -> tuple[str, StrategyName]:
+    if api_settings.stockfish_cache_position_only:
+        fen_string = get_position_key(fen_string=fen_string)
+
+    return fen_string, strategy_name
+
+
+async def get_cached_stockfish_move(
+    *,
+    cache_key: tuple[str, StrategyName],
+) -> str | None:
+    cached_move = stockfish_cache.get(cache_key)
+
+    if cached_move is not None or not shared_cache.is_enabled:
+        return cached_move
+
+    fen_string, strategy_name = cache_key
+    cached_move = await run_blocking(
+        shared_cache.get,
+        namespace=strategy_name,
+        key=fen_string,
+    )
+
+    if cached_move is not None:
+        stockfish_cache.set(cache_key, cached_move)
+
+    return cached_move
+
+
+def cache_stockfish_move(
+    *,
+    cache_key: tuple[str, StrategyName],
+    move_uci: str,
+) -> None:
+    stockfish_cache.set(cache_key, move_uci)
+
+    if shared_cache.is_enabled:
+        fen_string, strategy_name = cache_key
+
+        # Nobody waits for the write, other workers pick it up when it lands
+        strategy_executor.submit(
+            shared_cache.set,
+            namespace=strategy_name,
+            key=fen_string,
+            value=move_uci,
+        )
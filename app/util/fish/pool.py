@@ -0,0 +1,100 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+
+from app.config.log import logger
+from app.util.fish.uci import UciEngine, UciError
+from app.util.metrics import stockfish_pool_busy, stockfish_pool_size, time_stage
+
+
+class StockfishPool:
+    def __init__(
+        self: "StockfishPool",
+        *,
+        size: int,
+        init_stockfish: Callable[[], Awaitable[UciEngine]],
+    ) -> None:
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.size = size
+        self._init_stockfish = init_stockfish
+        self._idle: deque[UciEngine] = deque()
+        self._available = asyncio.Semaphore(0)
+
+    async def start(self: "StockfishPool") -> None:
+        for _ in range(self.size):
+            self._release(stockfish=await self._init_stockfish())
+
+        stockfish_pool_size.set(self.size)
+
+    async def close(self: "StockfishPool") -> None:
+        while self._idle:
+            await self._idle.popleft().quit()
+
+    def _release(self: "StockfishPool", *, stockfish: UciEngine) -> None:
+        self._idle.append(stockfish)
+        self._available.release()
+        stockfish_pool_busy.set(self.size - len(self._idle))
+
+    def _take(self: "StockfishPool", *, fen_string: str | None) -> UciEngine:
+        # Prefer the engine already pondering on this position, then engines
+        # whose ponder search is not worth keeping
+        candidates = [
+            *(
+                stockfish
+                for stockfish in self._idle
+                if fen_string is not None
+                and stockfish.is_pondering_on(fen_string=fen_string)
+            ),
+            *(stockfish for stockfish in self._idle if not stockfish.is_pondering),
+            self._idle[0],
+        ]
+        stockfish = candidates[0]
+        self._idle.remove(stockfish)
+        stockfish_pool_busy.set(self.size - len(self._idle))
+        return stockfish
+
+    async def _restart(self: "StockfishPool", *, stockfish: UciEngine) -> UciEngine:
+        logger.warning("Restarting crashed Stockfish process")
+
+        await stockfish.quit()
+
+        try:
+            return await self._init_stockfish()
+        except Exception:
+            # Keep the slot, the next checkout will try to restart it again
+            logger.exception("Failed to restart Stockfish process")
+            return stockfish
+
+    async def _ensure_healthy(
+        self: "StockfishPool",
+        *,
+        stockfish: UciEngine,
+    ) -> UciEngine:
+        if stockfish.is_alive:
+            return stockfish
+
+        return await self._restart(stockfish=stockfish)
+
+    @asynccontextmanager
+    async def checkout(
+        self: "StockfishPool",
+        *,
+        fen_string: str | None = None,
+    ) -> AsyncIterator[UciEngine]:
+        with time_stage(stage="engine_checkout"):
+            await self._available.acquire()
+
+        stockfish = self._take(fen_string=fen_string)
+
+        try:
+            stockfish = await self._ensure_healthy(stockfish=stockfish)
+            yield stockfish
+        except UciError:
+            # The engine state is unknown, it gets restarted on next checkout
+            await stockfish.quit()
+            raise
+        finally:
+            self._release(stockfish=stockfish)
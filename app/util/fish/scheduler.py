@@ -0,0 +1,164 @@
+import asyncio
+import math
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS, HTTP_503_SERVICE_UNAVAILABLE
+
+from app.util.metrics import engine_queue_length, engine_rejections, time_stage
+
+# Movetime tiers in ms and their share of freed engine slots
+TIER_WEIGHTS = {1: 16, 10: 8, 100: 4, 500: 2, 1000: 1}
+
+
+class EngineBusyError(Exception):
+    """Raised when engine work is rejected instead of queued"""
+
+    def __init__(
+        self: "EngineBusyError",
+        message: str,
+        *,
+        status_code: int,
+        retry_after: int,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class EngineScheduler:
+    def __init__(
+        self: "EngineScheduler",
+        *,
+        max_concurrent: int,
+        queue_size: int,
+        queue_timeout: float,
+        tier_weights: dict[int, int] = TIER_WEIGHTS,
+    ) -> None:
+        if max_concurrent < 1:
+            raise ValueError("Maximum concurrent searches must be at least 1")
+
+        self.max_concurrent = max_concurrent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.tier_weights = tier_weights
+        self._active = 0
+        self._queues: dict[int, deque[asyncio.Future[None]]] = {
+            tier: deque() for tier in tier_weights
+        }
+        # Smooth weighted round robin state, see _pick_tier
+        self._current_weights = {tier: 0 for tier in tier_weights}
+
+    def get_tier(self: "EngineScheduler", *, movetime: int) -> int:
+        return min(
+            (tier for tier in self.tier_weights if tier >= movetime),
+            default=max(self.tier_weights),
+        )
+
+    def get_retry_after(self: "EngineScheduler", *, tier: int) -> int:
+        # Seconds until the queued searches of the tier are likely done
+        queued_time = (len(self._queues[tier]) + 1) * tier / 1000
+        return max(1, math.ceil(queued_time / self.max_concurrent))
+
+    @asynccontextmanager
+    async def admit(
+        self: "EngineScheduler",
+        *,
+        movetime: int,
+        timeout: float | None = None,
+    ) -> AsyncIterator[None]:
+        # Admission is where requests wait for engine work, the pool checkout
+        # that follows is immediate
+        with time_stage(stage="engine_queue"):
+            await self._acquire(
+                tier=self.get_tier(movetime=movetime),
+                timeout=(
+                    self.queue_timeout
+                    if timeout is None
+                    else min(timeout, self.queue_timeout)
+                ),
+            )
+
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self: "EngineScheduler", *, tier: int, timeout: float) -> None:
+        if self._active < self.max_concurrent and not any(self._queues.values()):
+            self._active += 1
+            return
+
+        queue = self._queues[tier]
+
+        if len(queue) >= self.queue_size:
+            engine_rejections.inc(tier=str(tier), reason="queue_full")
+            raise EngineBusyError(
+                "Engine queue is full",
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                retry_after=self.get_retry_after(tier=tier),
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        self._update_queue_length(tier=tier)
+
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(tier=tier, waiter=waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(tier=tier, waiter=waiter)
+            engine_rejections.inc(tier=str(tier), reason="queue_timeout")
+            raise EngineBusyError(
+                "Timed out waiting for an engine",
+                status_code=HTTP_503_SERVICE_UNAVAILABLE,
+                retry_after=self.get_retry_after(tier=tier),
+            )
+
+    def _abandon(
+        self: "EngineScheduler",
+        *,
+        tier: int,
+        waiter: asyncio.Future[None],
+    ) -> None:
+        if waiter.done():
+            # The slot was handed over already, pass it on
+            self._release()
+            return
+
+        waiter.cancel()
+        self._queues[tier].remove(waiter)
+        self._update_queue_length(tier=tier)
+
+    def _release(self: "EngineScheduler") -> None:
+        tier = self._pick_tier()
+
+        if tier is None:
+            self._active -= 1
+            return
+
+        # The slot goes straight to the waiter, so the active count stays
+        self._queues[tier].popleft().set_result(None)
+        self._update_queue_length(tier=tier)
+
+    def _pick_tier(self: "EngineScheduler") -> int | None:
+        waiting_tiers = [tier for tier, queue in self._queues.items() if queue]
+
+        if not waiting_tiers:
+            return None
+
+        for tier in waiting_tiers:
+            self._current_weights[tier] += self.tier_weights[tier]
+
+        picked_tier = max(waiting_tiers, key=self._current_weights.__getitem__)
+        self._current_weights[picked_tier] -= sum(
+            self.tier_weights[tier] for tier in waiting_tiers
+        )
+        return picked_tier
+
+    def _update_queue_length(self: "EngineScheduler", *, tier: int) -> None:
+        engine_queue_length.set(len(self._queues[tier]), tier=str(tier))
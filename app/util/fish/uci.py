@@ -0,0 +1,337 @@
+import asyncio
+from asyncio.subprocess import PIPE, Process
+from collections.abc import AsyncGenerator
+from typing import NamedTuple
+
+from chess import Board
+
+from app.util.helper import get_position_key
+from app.util.schema import SearchLimit
+
+# Extra time an engine gets past its movetime before it is considered hung
+SEARCH_TIMEOUT_GRACE = 5.0
+QUIT_TIMEOUT = 1.0
+
+
+class UciError(Exception):
+    """Raised when the engine exits or stops following the UCI protocol"""
+
+    pass
+
+
+class BestMove(NamedTuple):
+    move: str | None
+    ponder: str | None
+
+
+def parse_bestmove(*, line: str) -> BestMove:
+    tokens = line.split()
+
+    if not tokens or tokens[0] != "bestmove":
+        raise UciError("Invalid bestmove line")
+
+    move = tokens[1] if len(tokens) > 1 and tokens[1] != "(none)" else None
+    ponder = tokens[3] if len(tokens) > 3 and tokens[2] == "ponder" else None
+
+    return BestMove(move=move, ponder=ponder)
+
+
+class SearchInfo(NamedTuple):
+    multipv: int
+    depth: int
+    # Scores are from the point of view of the side to move
+    score_cp: int | None
+    score_mate: int | None
+    pv: tuple[str, ...]
+
+
+def parse_info(*, line: str) -> SearchInfo | None:
+    tokens = line.split()
+
+    # Only lines carrying a scored principal variation are of interest
+    if (
+        len(tokens) < 2
+        or tokens[0] != "info"
+        or tokens[1] == "string"
+        or "pv" not in tokens
+        or "score" not in tokens
+    ):
+        return None
+
+    pv_index = tokens.index("pv")
+    values: dict[str, str] = {}
+    index = 1
+
+    try:
+        while index < pv_index:
+            name = tokens[index]
+
+            if name == "score":
+                values[tokens[index + 1]] = tokens[index + 2]
+                index += 3
+            elif name in ("lowerbound", "upperbound"):
+                index += 1
+            else:
+                values[name] = tokens[index + 1]
+                index += 2
+
+        return SearchInfo(
+            multipv=int(values.get("multipv", 1)),
+            depth=int(values.get("depth", 0)),
+            score_cp=int(values["cp"]) if "cp" in values else None,
+            score_mate=int(values["mate"]) if "mate" in values else None,
+            pv=tuple(tokens[pv_index + 1 :]),
+        )
+    except (IndexError, ValueError) as error:
+        raise UciError("Invalid info line") from error
+
+
+def format_go_command(*, search_limit: SearchLimit, ponder: bool = False) -> str:
+    tokens = ["go", "ponder"] if ponder else ["go"]
+    tokens.extend(["movetime", str(search_limit.movetime)])
+
+    if search_limit.depth is not None:
+        tokens.extend(["depth", str(search_limit.depth)])
+    if search_limit.nodes is not None:
+        tokens.extend(["nodes", str(search_limit.nodes)])
+
+    return " ".join(tokens)
+
+
+class UciEngine:
+    def __init__(
+        self: "UciEngine",
+        *,
+        path: str,
+        options: dict[str, int | str],
+    ) -> None:
+        self.path = path
+        self.options = options
+        self._process: Process | None = None
+        self._is_searching = False
+        self._multipv = 1
+        # Position and limits of the running ponder search
+        self._ponder_key: tuple[str, SearchLimit] | None = None
+        self._ponder_expiry: asyncio.TimerHandle | None = None
+
+    @property
+    def is_alive(self: "UciEngine") -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    @property
+    def is_pondering(self: "UciEngine") -> bool:
+        return self._ponder_key is not None
+
+    def is_pondering_on(self: "UciEngine", *, fen_string: str) -> bool:
+        return self._ponder_key is not None and self._ponder_key[0] == get_position_key(
+            fen_string=fen_string
+        )
+
+    async def start(self: "UciEngine") -> None:
+        self._process = await asyncio.create_subprocess_exec(
+            self.path,
+            stdin=PIPE,
+            stdout=PIPE,
+        )
+
+        self._send("uci")
+        await self._read_until(token="uciok")
+
+        self._send(
+            *(
+                f"setoption name {name} value {value}"
+                for name, value in self.options.items()
+            ),
+            "isready",
+        )
+        await self._read_until(token="readyok")
+
+    async def quit(self: "UciEngine") -> None:
+        self._clear_ponder()
+
+        if self._process is None or not self.is_alive:
+            return
+
+        self._send("quit")
+
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout=QUIT_TIMEOUT)
+        except TimeoutError:
+            self._process.kill()
+            await self._process.wait()
+
+    async def search(
+        self: "UciEngine",
+        *,
+        fen_string: str,
+        search_limit: SearchLimit,
+    ) -> BestMove:
+        if self._ponder_key == (get_position_key(fen_string=fen_string), search_limit):
+            # The ponder search becomes the real one, its movetime already runs
+            self._clear_ponder()
+            self._send("ponderhit")
+        else:
+            await self._wait_for_idle()
+            self._set_multipv(multipv=1)
+
+            # Position and limits go out in one write, without isready round-trips
+            self._send(
+                f"position fen {fen_string}",
+                format_go_command(search_limit=search_limit),
+            )
+            self._is_searching = True
+
+        try:
+            return await asyncio.wait_for(
+                self._read_bestmove(),
+                timeout=search_limit.movetime / 1000 + SEARCH_TIMEOUT_GRACE,
+            )
+        except TimeoutError as error:
+            self.stop()
+            raise UciError("Engine did not return a best move in time") from error
+        except asyncio.CancelledError:
+            # The caller went away, the pending bestmove is drained on next use
+            self.stop()
+            raise
+
+    async def analyze(
+        self: "UciEngine",
+        *,
+        fen_string: str,
+        search_limit: SearchLimit,
+        multipv: int,
+    ) -> AsyncGenerator[SearchInfo | BestMove, None]:
+        """Yield each scored info line of the search, then its best move"""
+        await self._wait_for_idle()
+        self._set_multipv(multipv=multipv)
+
+        self._send(
+            f"position fen {fen_string}",
+            format_go_command(search_limit=search_limit),
+        )
+        self._is_searching = True
+
+        loop = asyncio.get_running_loop()
+        timeout_at = loop.time() + search_limit.movetime / 1000 + SEARCH_TIMEOUT_GRACE
+
+        try:
+            while True:
+                line = await asyncio.wait_for(
+                    self._read_line(),
+                    timeout=timeout_at - loop.time(),
+                )
+
+                if line.startswith("bestmove"):
+                    self._is_searching = False
+                    yield parse_bestmove(line=line)
+                    return
+
+                search_info = parse_info(line=line)
+
+                if search_info is not None:
+                    yield search_info
+        except TimeoutError as error:
+            raise UciError("Engine did not return a best move in time") from error
+        finally:
+            # Also reached when the consumer stops early, the bestmove is drained
+            # on next use
+            self.stop()
+
+    async def ponder(
+        self: "UciEngine",
+        *,
+        fen_string: str,
+        best_move: str,
+        ponder_move: str,
+        search_limit: SearchLimit,
+        ponder_timeout: float,
+    ) -> None:
+        await self._wait_for_idle()
+        self._set_multipv(multipv=1)
+
+        board = Board(fen=fen_string)
+
+        try:
+            board.push_uci(best_move)
+            board.push_uci(ponder_move)
+        except ValueError:
+            return
+
+        self._send(
+            f"position fen {fen_string} moves {best_move} {ponder_move}",
+            format_go_command(search_limit=search_limit, ponder=True),
+        )
+        self._is_searching = True
+        self._ponder_key = (get_position_key(fen_string=board.fen()), search_limit)
+        # A ponder search only ends on ponderhit or stop, replies that never reach
+        # this engine would leave it searching forever
+        self._ponder_expiry = asyncio.get_running_loop().call_later(
+            ponder_timeout,
+            self._expire_ponder,
+        )
+
+    def stop(self: "UciEngine") -> None:
+        if self._is_searching and self.is_alive:
+            self._send("stop")
+
+    def _expire_ponder(self: "UciEngine") -> None:
+        # Only stopped here, its bestmove is drained on next use
+        self._ponder_expiry = None
+        self._ponder_key = None
+        self.stop()
+
+    def _clear_ponder(self: "UciEngine") -> None:
+        self._ponder_key = None
+
+        if self._ponder_expiry is not None:
+            self._ponder_expiry.cancel()
+            self._ponder_expiry = None
+
+    def _set_multipv(self: "UciEngine", *, multipv: int) -> None:
+        # Set lazily, an aborted analysis may have left more lines configured
+        if self._multipv != multipv:
+            self._send(f"setoption name MultiPV value {multipv}")
+            self._multipv = multipv
+
+    def _send(self: "UciEngine", *commands: str) -> None:
+        if self._process is None or self._process.stdin is None or not self.is_alive:
+            raise UciError("Engine is not running")
+
+        self._process.stdin.write(
+            "".join(f"{command}\n" for command in commands).encode()
+        )
+
+    async def _read_line(self: "UciEngine") -> str:
+        if self._process is None or self._process.stdout is None:
+            raise UciError("Engine is not running")
+
+        line = await self._process.stdout.readline()
+
+        if not line:
+            raise UciError("Engine process exited")
+
+        return line.decode().strip()
+
+    async def _read_until(self: "UciEngine", *, token: str) -> None:
+        while await self._read_line() != token:
+            pass
+
+    async def _read_bestmove(self: "UciEngine") -> BestMove:
+        while True:
+            line = await self._read_line()
+
+            if line.startswith("bestmove"):
+                self._is_searching = False
+                return parse_bestmove(line=line)
+
+    async def _wait_for_idle(self: "UciEngine") -> None:
+        if not self._is_searching:
+            return
+
+        self.stop()
+        self._clear_ponder()
+
+        try:
+            await asyncio.wait_for(self._read_bestmove(), timeout=SEARCH_TIMEOUT_GRACE)
+        except TimeoutError as error:
+            raise UciError("Engine did not stop searching") from error
@@ -0,0 +1,73 @@
+from chess import Move
+
+from app.util.board_cache import get_board
+from app.util.execute import compute_strategy_move, get_legal_move
+from app.util.fish.init_fish import get_pool_checkout
+from app.util.game_outcome import get_game_outcome
+from app.util.helper import to_move
+from app.util.schema import MoveOutcome, StrategyRequest
+
+# Asks the bot to move without a player move, e.g. when it plays white
+BOT_MOVE_MESSAGE = "go"
+
+
+class GameSession:
+    def __init__(self: "GameSession", *, strategy_request: StrategyRequest) -> None:
+        self.board = get_board(fen_string=strategy_request.fen_string)
+        self.strategy_name = strategy_request.strategy_name
+
+    def play_player_move(self: "GameSession", *, move_uci: str) -> MoveOutcome | None:
+        move = get_legal_move(board=self.board, move=Move.from_uci(uci=move_uci))
+
+        self.board.push(move)
+
+        game_outcome = get_game_outcome(board=self.board)
+
+        if game_outcome is None:
+            return None
+
+        return MoveOutcome(
+            game_outcome=game_outcome.game_outcome,
+            fen_string=self.board.fen(),
+        )
+
+    async def play_bot_move(self: "GameSession") -> MoveOutcome:
+        fen_string = self.board.fen()
+
+        move_outcome = await compute_strategy_move(
+            board=self.board,
+            fen_string=fen_string,
+            strategy_name=self.strategy_name,
+            engine_checkout=get_pool_checkout(fen_string=fen_string),
+        )
+
+        if move_outcome.chess_move is None:
+            return move_outcome
+
+        self.board.push(to_move(chess_move=move_outcome.chess_move))
+
+        game_outcome = get_game_outcome(board=self.board)
+
+        return MoveOutcome(
+            chess_move=move_outcome.chess_move,
+            game_outcome=game_outcome.game_outcome if game_outcome else None,
+            fen_string=self.board.fen(),
+        )
+
+    async def play(self: "GameSession", *, message: str) -> MoveOutcome:
+        if message == BOT_MOVE_MESSAGE:
+            return await self.play_bot_move()
+
+        move_count = len(self.board.move_stack)
+        game_outcome = self.play_player_move(move_uci=message)
+
+        if game_outcome is not None:
+            return game_outcome
+
+        try:
+            return await self.play_bot_move()
+        except Exception:
+            # The client only gets the error, so the player may send the move again
+            while len(self.board.move_stack) > move_count:
+                self.board.pop()
+            raise
@@ -1,8 +1,11 @@
 from random import random
 
-from chess import PIECE_NAMES, PIECE_SYMBOLS, Move
+from chess import PIECE_NAMES, PIECE_SYMBOLS, Move, parse_square
 
-from app.util.schema import ChessMove, MoveOutcome, StrategyName
+from app.util.schema import ChessMove, MoveOutcome, SearchLimit, StrategyName
+
+# Piece placement, side to move, castling rights and en passant square
+FEN_POSITION_FIELDS = 4
 
 
 def parse_move(*, move_uci: str) -> MoveOutcome:
@@ -26,19 +29,47 @@ def parse_move(*, move_uci: str) -> MoveOutcome:
     raise Exception("Invalid best move")
 
 
+# Depth and node limited tiers cost the same CPU time however loaded the host is,
+# their movetime only stops a search that is starved of CPU
+STOCKFISH_SEARCH_LIMITS: dict[StrategyName, SearchLimit] = {
+    "stockfish-1": SearchLimit(movetime=1),
+    "stockfish-10": SearchLimit(movetime=10),
+    "stockfish-100": SearchLimit(movetime=100),
+    "stockfish-500": SearchLimit(movetime=500),
+    "stockfish-1000": SearchLimit(movetime=1000),
+    "stockfish-depth-5": SearchLimit(movetime=100, depth=5),
+    "stockfish-depth-10": SearchLimit(movetime=500, depth=10),
+    "stockfish-depth-15": SearchLimit(movetime=2000, depth=15),
+    "stockfish-nodes-1000": SearchLimit(movetime=100, nodes=1000),
+    "stockfish-nodes-10000": SearchLimit(movetime=100, nodes=10000),
+    "stockfish-nodes-100000": SearchLimit(movetime=1000, nodes=100000),
+    "stockfish-nodes-1000000": SearchLimit(movetime=5000, nodes=1000000),
+}
+
+
+def get_search_limit_for_stockfish_strategy(*, strategy: StrategyName) -> SearchLimit:
+    search_limit = STOCKFISH_SEARCH_LIMITS.get(strategy)
+
+    if search_limit is None:
+        raise Exception("Invalid strategy")
+
+    return search_limit
+
+
 def get_time_for_stockfish_strategy(*, strategy: StrategyName) -> int:
-    if strategy == "stockfish-1":
-        return 1
-    if strategy == "stockfish-10":
-        return 10
-    if strategy == "stockfish-100":
-        return 100
-    if strategy == "stockfish-500":
-        return 500
-    if strategy == "stockfish-1000":
-        return 1000
+    return get_search_limit_for_stockfish_strategy(strategy=strategy).movetime
 
-    raise Exception("Invalid strategy")
+
+def get_strategy_movetime(*, strategy_name: StrategyName) -> int:
+    if strategy_name.startswith("stockfish-"):
+        return get_time_for_stockfish_strategy(strategy=strategy_name)
+
+    # Other strategies only search as the stockfish-10 fallback
+    return get_time_for_stockfish_strategy(strategy="stockfish-10")
+
+
+def get_position_key(*, fen_string: str) -> str:
+    return " ".join(fen_string.split()[:FEN_POSITION_FIELDS])
 
 
 def get_piece_type(*, name: str | None) -> int | None:
@@ -67,3 +98,11 @@ def should_do_stockfish_move(
     stockfish_move_prob: float,
 ) -> bool:
     return not moves or is_probability_proc(probability=stockfish_move_prob)
+
+
+def to_move(*, chess_move: ChessMove) -> Move:
+    return Move(
+        from_square=parse_square(name=chess_move.from_square),
+        to_square=parse_square(name=chess_move.to_square),
+        promotion=get_piece_type(name=chess_move.promotion),
+    )
@@ -0,0 +1,278 @@
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from app.util.cache import CacheStats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+LabelValues = tuple[str, ...]
+
+registry: list["Metric"] = []
+
+# Strategy of the request being served, stages are labelled with it
+current_strategy_name: ContextVar[str] = ContextVar(
+    "current_strategy_name",
+    default="unknown",
+)
+
+
+def escape_label_value(*, value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(*, names: tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+
+    pairs = ",".join(
+        f'{name}="{escape_label_value(value=value)}"'
+        for name, value in zip(names, values)
+    )
+    return f"{{{pairs}}}"
+
+
+def format_value(*, value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value))
+
+
+class Metric(ABC):
+    metric_type = "untyped"
+
+    def __init__(
+        self: "Metric",
+        *,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._lock = Lock()
+        registry.append(self)
+
+    def get_label_values(self: "Metric", labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}")
+
+        return tuple(labels[name] for name in self.label_names)
+
+    @abstractmethod
+    def render_samples(self: "Metric") -> list[str]:
+        pass
+
+    def render(self: "Metric") -> list[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self.render_samples(),
+        ]
+
+
+class ValueMetric(Metric):
+    def __init__(
+        self: "ValueMetric",
+        *,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+    ) -> None:
+        super().__init__(name=name, description=description, label_names=label_names)
+        self._values: dict[LabelValues, float] = {}
+
+    def _set_value(self: "ValueMetric", value: float, **labels: str) -> None:
+        label_values = self.get_label_values(labels)
+
+        with self._lock:
+            self._values[label_values] = value
+
+    def render_samples(self: "ValueMetric") -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+
+        return [
+            f"{self.name}{format_labels(names=self.label_names, values=label_values)}"
+            f" {format_value(value=value)}"
+            for label_values, value in values.items()
+        ]
+
+
+class Counter(ValueMetric):
+    metric_type = "counter"
+
+    def inc(self: "Counter", amount: float = 1, **labels: str) -> None:
+        label_values = self.get_label_values(labels)
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def set_total(self: "Counter", value: float, **labels: str) -> None:
+        # For totals counted elsewhere, such as the stats of a cache
+        self._set_value(value, **labels)
+
+
+class Gauge(ValueMetric):
+    metric_type = "gauge"
+
+    def set(self: "Gauge", value: float, **labels: str) -> None:
+        self._set_value(value, **labels)
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self: "Histogram",
+        *,
+        name: str,
+        description: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name=name, description=description, label_names=label_names)
+        self.buckets = (*buckets, float("inf"))
+        # Per label values: count per bucket, then the sum of observations
+        self._values: dict[LabelValues, tuple[list[int], float]] = {}
+
+    def observe(self: "Histogram", value: float, **labels: str) -> None:
+        label_values = self.get_label_values(labels)
+
+        with self._lock:
+            bucket_counts, total = self._values.get(
+                label_values,
+                ([0] * len(self.buckets), 0.0),
+            )
+
+            for index, bucket in enumerate(self.buckets):
+                if value <= bucket:
+                    bucket_counts[index] += 1
+
+            self._values[label_values] = (bucket_counts, total + value)
+
+    @contextmanager
+    def time(self: "Histogram", **labels: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def render_samples(self: "Histogram") -> list[str]:
+        with self._lock:
+            values = {
+                label_values: (list(bucket_counts), total)
+                for label_values, (bucket_counts, total) in self._values.items()
+            }
+
+        samples = []
+        for label_values, (bucket_counts, total) in values.items():
+            labels = format_labels(names=self.label_names, values=label_values)
+
+            for bucket, count in zip(self.buckets, bucket_counts):
+                bucket_labels = format_labels(
+                    names=(*self.label_names, "le"),
+                    values=(*label_values, format_value(value=bucket)),
+                )
+                samples.append(f"{self.name}_bucket{bucket_labels} {count}")
+
+            samples.append(f"{self.name}_sum{labels} {format_value(value=total)}")
+            samples.append(f"{self.name}_count{labels} {bucket_counts[-1]}")
+
+        return samples
+
+
+strategy_duration = Histogram(
+    name="chess_strategy_duration_seconds",
+    description="Time to compute a move, per strategy",
+    label_names=("strategy_name",),
+)
+stage_duration = Histogram(
+    name="chess_stage_duration_seconds",
+    description="Time spent in each stage of computing a move",
+    label_names=("strategy_name", "stage"),
+)
+stockfish_fallbacks = Counter(
+    name="chess_stockfish_fallbacks_total",
+    description="Moves handed to Stockfish instead of the requested strategy",
+    label_names=("strategy_name", "reason"),
+)
+stockfish_pool_size = Gauge(
+    name="chess_stockfish_pool_size",
+    description="Stockfish processes in the pool",
+)
+stockfish_pool_busy = Gauge(
+    name="chess_stockfish_pool_busy",
+    description="Stockfish processes checked out of the pool",
+)
+engine_queue_length = Gauge(
+    name="chess_engine_queue_length",
+    description="Requests waiting for engine work, per movetime tier",
+    label_names=("tier",),
+)
+engine_rejections = Counter(
+    name="chess_engine_rejections_total",
+    description="Requests turned away by the engine scheduler",
+    label_names=("tier", "reason"),
+)
+cache_hits = Counter(
+    name="chess_cache_hits_total",
+    description="Lookups answered by the cache",
+    label_names=("cache",),
+)
+cache_misses = Counter(
+    name="chess_cache_misses_total",
+    description="Lookups the cache could not answer",
+    label_names=("cache",),
+)
+cache_hit_ratio = Gauge(
+    name="chess_cache_hit_ratio",
+    description="Share of lookups answered by the cache",
+    label_names=("cache",),
+)
+
+
+@contextmanager
+def time_stage(*, stage: str) -> Iterator[None]:
+    with stage_duration.time(strategy_name=current_strategy_name.get(), stage=stage):
+        yield
+
+
+def record_stockfish_fallback(*, reason: str) -> None:
+    stockfish_fallbacks.inc(strategy_name=current_strategy_name.get(), reason=reason)
+
+
+def record_cache_stats(*, cache_name: str, stats: CacheStats) -> None:
+    lookups = stats.hits + stats.misses
+
+    cache_hits.set_total(stats.hits, cache=cache_name)
+    cache_misses.set_total(stats.misses, cache=cache_name)
+    cache_hit_ratio.set(stats.hits / lookups if lookups else 0, cache=cache_name)
+
+
+def render_metrics() -> str:
+    return "".join(f"{line}\n" for metric in registry for line in metric.render())
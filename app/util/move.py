@@ -1,153 +1,315 @@
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
 from random import choice
+from time import monotonic
 from typing import cast
 
 from chess import Board, Move
-from stockfish import Stockfish
 
-from app.util.board_evaluation import (
-    evaluate_and_get_optimal_move,
-    get_move_based_on_value,
+from app.util.board_cache import get_board
+from app.util.board_evaluation import evaluate_and_get_optimal_move
+from app.util.deadline import current_deadline, get_deadline_movetime
+from app.util.executor import run_blocking
+from app.util.fish.book import get_book_move, opening_book
+from app.util.fish.init_fish import EngineCheckout
+from app.util.fish.move_cache import (
+    cache_stockfish_move,
+    get_cached_stockfish_move,
+    get_stockfish_cache_key,
 )
+from app.util.fish.uci import SearchInfo
 from app.util.helper import (
-    get_time_for_stockfish_strategy,
+    get_position_key,
+    get_search_limit_for_stockfish_strategy,
     parse_move,
     should_do_stockfish_move,
 )
+from app.util.metrics import record_stockfish_fallback, time_stage
 from app.util.schema import MoveOutcome, StrategyName
-from app.util.strategy.checkmate_express import get_worst_moves
+from app.util.settings import api_settings
+from app.util.shared_cache import shared_cache
+from app.util.strategy.checkmate_express import get_worst_move
+from app.util.strategy.context import MoveContext
 from app.util.strategy.dichrome import filter_dichrome_moves
 from app.util.strategy.elusive import filter_elusive_moves
 from app.util.strategy.monochrome import filter_monochrome_moves
 from app.util.strategy.predator import filter_predator_moves
 
 
-def get_stockfish_move(
+async def get_known_stockfish_move(
     *,
-    stockfish: Stockfish,
     strategy_name: StrategyName,
     fen_string: str,
+    cache_key: tuple[str, StrategyName],
+) -> str | None:
+    if opening_book is not None:
+        book_move = get_book_move(
+            book=opening_book,
+            board=get_board(fen_string=fen_string),
+            strategy_name=strategy_name,
+        )
+
+        if book_move is not None:
+            return book_move.uci()
+
+    return await get_cached_stockfish_move(cache_key=cache_key)
+
+
+async def get_stockfish_move(
+    *,
+    engine_checkout: EngineCheckout,
+    strategy_name: StrategyName,
+    fen_string: str,
+    ponder: bool = False,
 ) -> MoveOutcome:
-    stockfish.set_fen_position(fen_position=fen_string)
-    time = get_time_for_stockfish_strategy(strategy=strategy_name)
-    best_move = stockfish.get_best_move_time(time=time)
+    cache_key = get_stockfish_cache_key(
+        fen_string=fen_string,
+        strategy_name=strategy_name,
+    )
+    known_move = await get_known_stockfish_move(
+        strategy_name=strategy_name,
+        fen_string=fen_string,
+        cache_key=cache_key,
+    )
+
+    if known_move is not None:
+        return parse_move(move_uci=known_move)
+
+    search_limit = get_search_limit_for_stockfish_strategy(strategy=strategy_name)
+
+    # The engine is only taken once neither the book nor a cache knows the move
+    async with engine_checkout(strategy_name) as stockfish:
+        # Measured after the checkout, so the time spent queueing is not searched
+        movetime = get_deadline_movetime(movetime=search_limit.movetime)
+
+        with time_stage(stage="engine_search"):
+            best_move = await stockfish.search(
+                fen_string=fen_string,
+                search_limit=search_limit._replace(movetime=movetime),
+            )
+
+        if not best_move.move:
+            raise Exception("No best move found")
+
+        if movetime < search_limit.movetime:
+            # A search cut short by the deadline is not what the tier promises
+            return parse_move(move_uci=best_move.move)
 
-    if not best_move:
-        raise Exception("No best move found")
+        cache_stockfish_move(cache_key=cache_key, move_uci=best_move.move)
 
-    return parse_move(move_uci=best_move)
+        if ponder and best_move.ponder:
+            # Search the expected reply while the player thinks
+            await stockfish.ponder(
+                fen_string=fen_string,
+                best_move=best_move.move,
+                ponder_move=best_move.ponder,
+                search_limit=search_limit,
+                ponder_timeout=api_settings.stockfish_ponder_timeout,
+            )
+
+    return parse_move(move_uci=best_move.move)
+
+
+async def stream_stockfish_move(
+    *,
+    engine_checkout: EngineCheckout,
+    strategy_name: StrategyName,
+    fen_string: str,
+) -> AsyncIterator[SearchInfo | MoveOutcome]:
+    """Yield the search progress of the engine, then the move it settled on"""
+    cache_key = get_stockfish_cache_key(
+        fen_string=fen_string,
+        strategy_name=strategy_name,
+    )
+    known_move = await get_known_stockfish_move(
+        strategy_name=strategy_name,
+        fen_string=fen_string,
+        cache_key=cache_key,
+    )
+
+    if known_move is not None:
+        yield parse_move(move_uci=known_move)
+        return
+
+    async with engine_checkout(strategy_name) as stockfish:
+        async for search_update in stockfish.analyze(
+            fen_string=fen_string,
+            search_limit=get_search_limit_for_stockfish_strategy(
+                strategy=strategy_name
+            ),
+            multipv=1,
+        ):
+            if isinstance(search_update, SearchInfo):
+                yield search_update
+                continue
+
+            if not search_update.move:
+                raise Exception("No best move found")
+
+            cache_stockfish_move(cache_key=cache_key, move_uci=search_update.move)
+            yield parse_move(move_uci=search_update.move)
+
+
+def choose_random_move(*, board: Board) -> MoveOutcome:
+    return parse_move(move_uci=choice(list(board.generate_legal_moves())).uci())
 
 
-def get_random_move(
-    _stockfish: Stockfish,
+async def get_random_move(
+    _engine_checkout: EngineCheckout,
     board: Board,
+    _fen_string: str,
     _stockfish_move_prob: float,
 ) -> MoveOutcome:
-    return parse_move(move_uci=choice(list(board.generate_legal_moves())).uci())
+    return choose_random_move(board=board)
 
 
-def get_move(
+def choose_move(
     *,
-    stockfish: Stockfish,
     board: Board,
     stockfish_move_prob: float,
-    filter_moves: Callable[[Board], list[Move]],
-) -> MoveOutcome:
-    filtered_moves = filter_moves(board)
+    filter_moves: Callable[[MoveContext], list[Move]],
+) -> Move | None:
+    with time_stage(stage="move_generation"):
+        filtered_moves = filter_moves(MoveContext(board=board))
 
     if should_do_stockfish_move(
         moves=filtered_moves,
         stockfish_move_prob=stockfish_move_prob,
     ):
-        return get_stockfish_move(
-            stockfish=stockfish,
-            strategy_name="stockfish-10",
-            fen_string=board.fen(),
+        return None
+
+    with time_stage(stage="evaluation"):
+        return evaluate_and_get_optimal_move(board=board, moves=filtered_moves)
+
+
+def choose_worst_move(*, board: Board, fen_string: str) -> Move | None:
+    # The chosen move only depends on the position, so workers share it
+    position_key = get_position_key(fen_string=fen_string)
+    cached_move = shared_cache.get(namespace="checkmate-express", key=position_key)
+
+    if cached_move is not None:
+        return Move.from_uci(cached_move)
+
+    deadline = current_deadline.get()
+
+    with time_stage(stage="evaluation"):
+        move = get_worst_move(board=board, deadline=deadline)
+
+    # Past the deadline the search may have been cut off, so it is not shared
+    if move is not None and (deadline is None or monotonic() < deadline):
+        shared_cache.set(
+            namespace="checkmate-express",
+            key=position_key,
+            value=move.uci(),
         )
 
-    return parse_move(
-        move_uci=evaluate_and_get_optimal_move(
-            board=board,
-            moves=filtered_moves,
-        ).uci()
+    return move
+
+
+async def get_move(
+    *,
+    engine_checkout: EngineCheckout,
+    board: Board,
+    fen_string: str,
+    stockfish_move_prob: float,
+    filter_moves: Callable[[MoveContext], list[Move]],
+) -> MoveOutcome:
+    move = await run_blocking(
+        choose_move,
+        board=board,
+        stockfish_move_prob=stockfish_move_prob,
+        filter_moves=filter_moves,
     )
 
+    if move is None:
+        record_stockfish_fallback(reason="strategy")
+        return await get_stockfish_move(
+            engine_checkout=engine_checkout,
+            strategy_name="stockfish-10",
+            fen_string=fen_string,
+        )
+
+    return parse_move(move_uci=move.uci())
+
 
-def get_elusive_move(
-    stockfish: Stockfish,
+async def get_elusive_move(
+    engine_checkout: EngineCheckout,
     board: Board,
+    fen_string: str,
     stockfish_move_prob: float = 0.1,
 ) -> MoveOutcome:
-    return get_move(
-        stockfish=stockfish,
+    return await get_move(
+        engine_checkout=engine_checkout,
         board=board,
+        fen_string=fen_string,
         stockfish_move_prob=stockfish_move_prob,
         filter_moves=filter_elusive_moves,
     )
 
 
-def get_predator_move(
-    stockfish: Stockfish,
+async def get_predator_move(
+    engine_checkout: EngineCheckout,
     board: Board,
+    fen_string: str,
     stockfish_move_prob: float,
 ) -> MoveOutcome:
-    return get_move(
-        stockfish=stockfish,
+    return await get_move(
+        engine_checkout=engine_checkout,
         board=board,
+        fen_string=fen_string,
         stockfish_move_prob=stockfish_move_prob,
         filter_moves=filter_predator_moves,
     )
 
 
-def get_monochrome_move(
-    stockfish: Stockfish,
+async def get_monochrome_move(
+    engine_checkout: EngineCheckout,
     board: Board,
+    fen_string: str,
     stockfish_move_prob: float,
 ) -> MoveOutcome:
-    return get_move(
-        stockfish=stockfish,
+    return await get_move(
+        engine_checkout=engine_checkout,
         board=board,
+        fen_string=fen_string,
         stockfish_move_prob=stockfish_move_prob,
         filter_moves=filter_monochrome_moves,
     )
 
 
-def get_dichrome_move(
-    stockfish: Stockfish,
+async def get_dichrome_move(
+    engine_checkout: EngineCheckout,
     board: Board,
+    fen_string: str,
     stockfish_move_prob: float,
 ) -> MoveOutcome:
-    return get_move(
-        stockfish=stockfish,
+    return await get_move(
+        engine_checkout=engine_checkout,
         board=board,
+        fen_string=fen_string,
         stockfish_move_prob=stockfish_move_prob,
         filter_moves=filter_dichrome_moves,
     )
 
 
-def get_checkmate_express_move(
-    _stockfish: Stockfish,
+async def get_checkmate_express_move(
+    _engine_checkout: EngineCheckout,
     board: Board,
+    fen_string: str,
     _stockfish_move_prob: float,
 ) -> MoveOutcome:
-    worst_moves = get_worst_moves(board=board, player_moves=list(board.legal_moves))
+    # The worst move is the one with the best outcome for the opponent
+    move = await run_blocking(choose_worst_move, board=board, fen_string=fen_string)
 
-    if worst_moves:
-        # Max is because we calculate the worst moves
-        # based on the opponent's perspective
-        move = get_move_based_on_value(move_values=worst_moves, fn=max)
+    if move is not None:
         return parse_move(move_uci=move.uci())
 
-    return get_random_move(
-        _stockfish=_stockfish,
-        board=board,
-        _stockfish_move_prob=_stockfish_move_prob,
-    )
+    return choose_random_move(board=board)
 
 
-def get_random_strategy_move(
-    stockfish: Stockfish,
+async def get_random_strategy_move(
+    engine_checkout: EngineCheckout,
     board: Board,
+    fen_string: str,
     stockfish_move_prob: float,
 ) -> MoveOutcome:
     strategies: list[StrategyName] = [
@@ -163,8 +325,8 @@ def get_random_strategy_move(
     strategy = choice(strategies)
 
     if strategy == "stockfish":
-        return get_stockfish_move(
-            stockfish=stockfish,
+        return await get_stockfish_move(
+            engine_checkout=engine_checkout,
             strategy_name=cast(
                 StrategyName,
                 choice(
@@ -177,48 +339,54 @@ def get_random_strategy_move(
                     ]
                 ),
             ),
-            fen_string=board.fen(),
+            fen_string=fen_string,
         )
 
     if strategy == "random-move":
-        return get_random_move(
-            _stockfish=stockfish,
+        return await get_random_move(
+            _engine_checkout=engine_checkout,
             board=board,
+            _fen_string=fen_string,
             _stockfish_move_prob=stockfish_move_prob,
         )
 
     if strategy == "elusive":
-        return get_elusive_move(
-            stockfish=stockfish,
+        return await get_elusive_move(
+            engine_checkout=engine_checkout,
             board=board,
+            fen_string=fen_string,
             stockfish_move_prob=stockfish_move_prob,
         )
 
     if strategy == "predator":
-        return get_predator_move(
-            stockfish=stockfish,
+        return await get_predator_move(
+            engine_checkout=engine_checkout,
             board=board,
+            fen_string=fen_string,
             stockfish_move_prob=stockfish_move_prob,
         )
 
     if strategy == "monochrome":
-        return get_monochrome_move(
-            stockfish=stockfish,
+        return await get_monochrome_move(
+            engine_checkout=engine_checkout,
             board=board,
+            fen_string=fen_string,
             stockfish_move_prob=stockfish_move_prob,
         )
 
     if strategy == "dichrome":
-        return get_dichrome_move(
-            stockfish=stockfish,
+        return await get_dichrome_move(
+            engine_checkout=engine_checkout,
             board=board,
+            fen_string=fen_string,
             stockfish_move_prob=stockfish_move_prob,
         )
 
     if strategy == "checkmate-express":
-        return get_checkmate_express_move(
-            _stockfish=stockfish,
+        return await get_checkmate_express_move(
+            _engine_checkout=engine_checkout,
             board=board,
+            fen_string=fen_string,
             _stockfish_move_prob=stockfish_move_prob,
         )
 
@@ -1,6 +1,7 @@
 from typing import Literal, NamedTuple
 
 from chess import Move
+from pydantic import Field
 
 from app.config.pydantic import Immutable
 
@@ -18,12 +19,27 @@ StrategyName = Literal[
     "stockfish-100",
     "stockfish-500",
     "stockfish-1000",
+    "stockfish-depth-5",
+    "stockfish-depth-10",
+    "stockfish-depth-15",
+    "stockfish-nodes-1000",
+    "stockfish-nodes-10000",
+    "stockfish-nodes-100000",
+    "stockfish-nodes-1000000",
 ]
 
 
+class SearchLimit(NamedTuple):
+    movetime: int
+    depth: int | None = None
+    nodes: int | None = None
+
+
 class StrategyRequest(Immutable):
     fen_string: str
     strategy_name: StrategyName
+    # Latency budget of the whole request, queueing included
+    deadline_ms: int | None = Field(default=None, gt=0)
 
 
 Winner = Literal["white", "black", "draw"]
@@ -56,6 +72,44 @@ class ChessMove(Immutable):
 class MoveOutcome(Immutable):
     chess_move: ChessMove | None = None
     game_outcome: GameOutcome | None = None
+    # Position after a played move, so clients need not replay it
+    fen_string: str | None = None
+
+
+class AnalysisRequest(Immutable):
+    fen_string: str
+    strategy_name: StrategyName = "stockfish-100"
+    multipv: int = Field(default=3, gt=0)
+
+
+class CandidateMove(Immutable):
+    rank: int
+    depth: int
+    # Centipawns or moves to mate, from the point of view of the side to move
+    score_cp: int | None = None
+    score_mate: int | None = None
+    chess_move: ChessMove
+    pv: list[str]
+
+
+class AnalysisOutcome(Immutable):
+    candidate_moves: list[CandidateMove] = []
+    game_outcome: GameOutcome | None = None
+
+
+class AnalysisMessage(Immutable):
+    candidate_move: CandidateMove | None = None
+    analysis_outcome: AnalysisOutcome | None = None
+
+
+class BatchMoveOutcome(Immutable):
+    move_outcome: MoveOutcome | None = None
+    error: str | None = None
+
+
+class GameMessage(Immutable):
+    move_outcome: MoveOutcome | None = None
+    error: str | None = None
 
 
 class MoveEvaluation(NamedTuple):
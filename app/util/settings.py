@@ -6,6 +6,42 @@ class ApiSettings(BaseSettings):
     allowed_origin: str = Field(..., env="ALLOWED_ORIGIN")
     is_local: bool = Field(env="IS_LOCAL", default=True)
     api_workers: int = Field(env="API_WORKERS", default=4)
+    stockfish_path: str | None = Field(env="STOCKFISH_PATH", default=None)
+    stockfish_pool_size: int = Field(env="STOCKFISH_POOL_SIZE", default=2)
+    stockfish_threads: int = Field(env="STOCKFISH_THREADS", default=1)
+    # Transposition table size of each engine in MB
+    stockfish_hash: int = Field(env="STOCKFISH_HASH", default=16)
+    max_concurrent_searches: int | None = Field(
+        env="MAX_CONCURRENT_SEARCHES",
+        default=None,
+    )
+    engine_queue_size: int = Field(env="ENGINE_QUEUE_SIZE", default=100)
+    engine_queue_timeout: float = Field(env="ENGINE_QUEUE_TIMEOUT", default=5)
+    deadline_fallback_ms: float = Field(env="DEADLINE_FALLBACK_MS", default=5)
+    strategy_workers: int = Field(env="STRATEGY_WORKERS", default=8)
+    stockfish_cache_size: int = Field(env="STOCKFISH_CACHE_SIZE", default=10000)
+    stockfish_cache_ttl: float | None = Field(env="STOCKFISH_CACHE_TTL", default=3600)
+    stockfish_cache_position_only: bool = Field(
+        env="STOCKFISH_CACHE_POSITION_ONLY",
+        default=False,
+    )
+    shared_cache_path: str | None = Field(env="SHARED_CACHE_PATH", default=None)
+    shared_cache_ttl: float | None = Field(env="SHARED_CACHE_TTL", default=86400)
+    opening_book_path: str | None = Field(env="OPENING_BOOK_PATH", default=None)
+    max_batch_size: int = Field(env="MAX_BATCH_SIZE", default=1000)
+    max_multipv: int = Field(env="MAX_MULTIPV", default=10)
+    speculative_move_cache_size: int = Field(
+        env="SPECULATIVE_MOVE_CACHE_SIZE",
+        default=1000,
+    )
+    speculative_move_ttl: float = Field(env="SPECULATIVE_MOVE_TTL", default=30)
+    board_cache_size: int = Field(env="BOARD_CACHE_SIZE", default=1000)
+    stockfish_ponder: bool = Field(env="STOCKFISH_PONDER", default=False)
+    # Seconds a ponder search may run while waiting for the player to reply
+    stockfish_ponder_timeout: float = Field(
+        env="STOCKFISH_PONDER_TIMEOUT",
+        default=10,
+    )
 
     @property
     def allowed_origins(self: "ApiSettings") -> list[str]:
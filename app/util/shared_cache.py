@@ -0,0 +1,101 @@
+import sqlite3
+import time
+from threading import local
+
+from app.config.log import logger
+from app.util.settings import api_settings
+
+# Seconds a connection waits for another worker's write lock
+BUSY_TIMEOUT = 1.0
+# Expired rows are deleted once every this many writes of a process
+PRUNE_INTERVAL = 1000
+
+
+class SharedCache:
+    """Key-value store in a SQLite file, shared by every worker on the host"""
+
+    def __init__(self: "SharedCache", *, path: str | None, ttl: float | None) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._local = local()
+        self._writes = 0
+
+    @property
+    def is_enabled(self: "SharedCache") -> bool:
+        return self.path is not None
+
+    def _get_connection(self: "SharedCache", *, path: str) -> sqlite3.Connection:
+        # SQLite connections can't be shared between threads
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(
+                path,
+                timeout=BUSY_TIMEOUT,
+                isolation_level=None,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, "
+                "key TEXT NOT NULL, "
+                "value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key)"
+                ") WITHOUT ROWID"
+            )
+            self._local.connection = connection
+
+        return connection
+
+    def get(self: "SharedCache", *, namespace: str, key: str) -> str | None:
+        if self.path is None:
+            return None
+
+        try:
+            connection = self._get_connection(path=self.path)
+            row = connection.execute(
+                "SELECT value, stored_at FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning("Shared cache read failed", exc_info=True)
+            return None
+
+        if row is None:
+            return None
+
+        value, stored_at = row
+
+        if self.ttl is not None and time.time() - stored_at > self.ttl:
+            return None
+
+        return value
+
+    def set(self: "SharedCache", *, namespace: str, key: str, value: str) -> None:
+        if self.path is None:
+            return
+
+        try:
+            connection = self._get_connection(path=self.path)
+            connection.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                (namespace, key, value, time.time()),
+            )
+
+            self._writes += 1
+
+            if self.ttl is not None and self._writes % PRUNE_INTERVAL == 0:
+                connection.execute(
+                    "DELETE FROM cache WHERE stored_at < ?",
+                    (time.time() - self.ttl,),
+                )
+        except sqlite3.Error:
+            logger.warning("Shared cache write failed", exc_info=True)
+
+
+shared_cache = SharedCache(
+    path=api_settings.shared_cache_path,
+    ttl=api_settings.shared_cache_ttl,
+)
@@ -0,0 +1,83 @@
+import asyncio
+
+from app.config.log import logger
+from app.util.board_cache import get_board
+from app.util.cache import LruCache
+from app.util.execute import execute_pooled_strategy, play_move
+from app.util.executor import run_blocking
+from app.util.helper import get_position_key
+from app.util.schema import ChessMove, MoveOutcome, StrategyName, StrategyRequest
+from app.util.settings import api_settings
+
+speculative_moves: LruCache[
+    tuple[str, StrategyName], asyncio.Task[MoveOutcome]
+] = LruCache(
+    capacity=api_settings.speculative_move_cache_size,
+    ttl=api_settings.speculative_move_ttl,
+)
+
+# The event loop only keeps weak references to tasks
+_running_speculations: set[asyncio.Task[MoveOutcome]] = set()
+
+
+def get_speculation_key(
+    *,
+    strategy_request: StrategyRequest,
+) -> tuple[str, StrategyName]:
+    # Clients rebuild the FEN themselves, so move counters may not match ours
+    return (
+        get_position_key(fen_string=strategy_request.fen_string),
+        strategy_request.strategy_name,
+    )
+
+
+def finish_speculation(task: asyncio.Task[MoveOutcome]) -> None:
+    _running_speculations.discard(task)
+
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Speculative move failed: {task.exception()}")
+
+
+def start_speculative_move(*, strategy_request: StrategyRequest) -> None:
+    task = asyncio.create_task(
+        execute_pooled_strategy(strategy_request=strategy_request)
+    )
+    task.add_done_callback(finish_speculation)
+    _running_speculations.add(task)
+
+    speculative_moves.set(get_speculation_key(strategy_request=strategy_request), task)
+
+
+async def pop_speculative_move(
+    *,
+    strategy_request: StrategyRequest,
+) -> MoveOutcome | None:
+    task = speculative_moves.pop(get_speculation_key(strategy_request=strategy_request))
+
+    if task is None:
+        return None
+
+    try:
+        return await task
+    except Exception:
+        # Already logged, the caller computes the move itself
+        return None
+
+
+async def execute_move_and_speculate(
+    *,
+    chess_move: ChessMove,
+    strategy_request: StrategyRequest,
+) -> MoveOutcome:
+    board = get_board(fen_string=strategy_request.fen_string)
+    move_outcome = await run_blocking(play_move, board=board, chess_move=chess_move)
+
+    if move_outcome.game_outcome is None and move_outcome.fen_string is not None:
+        start_speculative_move(
+            strategy_request=StrategyRequest(
+                fen_string=move_outcome.fen_string,
+                strategy_name=strategy_request.strategy_name,
+            )
+        )
+
+    return move_outcome
@@ -1,47 +1,220 @@
-from chess import Board, Move
+from itertools import islice
+from time import monotonic
+
+from chess import BB_RANK_2, BB_RANK_7, PAWN, QUEEN, WHITE, Board, Move
 
 from app.util.board_evaluation import (
-    NoMovesToEvaluateError,
-    evaluate_and_get_optimal_move,
-    simulate_move_and_evaluate,
+    PIECE_TYPE_VALUES,
+    PackedBoard,
+    evaluate_board,
+    evaluate_packed_boards,
+    get_move_value_delta,
+    pack_board_after_move,
 )
 from app.util.schema import MoveEvaluation
 
+PROMOTION_VALUE_DELTA = PIECE_TYPE_VALUES[QUEEN] - PIECE_TYPE_VALUES[PAWN]
+
 
 def get_worst_move_based_on_opponent_response(
     *,
     board: Board,
     player_move: Move,
+    player_value: int,
 ) -> MoveEvaluation | None:
-    hypothetical_board = board.copy(stack=False)
-    hypothetical_board.push(player_move)
-    opponent_moves = list(hypothetical_board.legal_moves)
+    # Material from the opponent's perspective once the player move is made
+    opponent_value = -(
+        player_value + get_move_value_delta(board=board, move=player_move)
+    )
+
+    board.push(player_move)
 
     try:
-        best_opponent_move = evaluate_and_get_optimal_move(
-            board=hypothetical_board,
-            moves=opponent_moves,
-            is_max=True,
-        )
-    except NoMovesToEvaluateError:
+        opponent_deltas = [
+            get_move_value_delta(board=board, move=opponent_move)
+            for opponent_move in board.legal_moves
+        ]
+    finally:
+        board.pop()
+
+    if not opponent_deltas:
         return None
 
     return MoveEvaluation(
         move=player_move,
-        value=simulate_move_and_evaluate(
-            board=hypothetical_board,
-            move=best_opponent_move,
-        ),
+        value=opponent_value + max(opponent_deltas),
+    )
+
+
+def get_batch_worst_moves(
+    *,
+    board: Board,
+    player_moves: list[Move],
+) -> list[MoveEvaluation]:
+    # Every reply position is packed first and scored in one call
+    reply_counts: list[int] = []
+    packed_boards: list[PackedBoard] = []
+
+    for player_move in player_moves:
+        board.push(player_move)
+
+        try:
+            replies = list(board.legal_moves)
+            packed_boards.extend(
+                pack_board_after_move(board=board, move=reply) for reply in replies
+            )
+        finally:
+            board.pop()
+
+        reply_counts.append(len(replies))
+
+    values = iter(
+        evaluate_packed_boards(
+            packed_boards=packed_boards,
+            player_color=not board.turn,
+        )
     )
 
+    worst_moves = []
+    for player_move, reply_count in zip(player_moves, reply_counts):
+        reply_values = list(islice(values, reply_count))
+        if reply_values:
+            worst_moves.append(
+                MoveEvaluation(move=player_move, value=max(reply_values))
+            )
+    return worst_moves
+
+
+def get_worst_moves(
+    *,
+    board: Board,
+    player_moves: list[Move],
+    batch: bool = False,
+) -> list[MoveEvaluation]:
+    if batch:
+        return get_batch_worst_moves(board=board, player_moves=player_moves)
+
+    player_value = evaluate_board(board=board, player_color=board.turn)
 
-def get_worst_moves(*, board: Board, player_moves: list[Move]) -> list[MoveEvaluation]:
     worst_moves = []
     for player_move in player_moves:
         move_evaluation = get_worst_move_based_on_opponent_response(
             board=board,
             player_move=player_move,
+            player_value=player_value,
         )
         if move_evaluation is not None:
             worst_moves.append(move_evaluation)
     return worst_moves
+
+
+def get_promotion_bound(*, board: Board) -> int:
+    """Upper bound of the material a non-capturing move gains the side to move"""
+
+    promotion_rank = BB_RANK_7 if board.turn == WHITE else BB_RANK_2
+
+    if board.pawns & board.occupied_co[board.turn] & promotion_rank:
+        return PROMOTION_VALUE_DELTA
+
+    return 0
+
+
+def get_capture_bound(*, board: Board) -> int:
+    """Upper bound of the material a capture takes from the side not to move"""
+
+    targets = board.occupied_co[not board.turn] & ~board.kings
+
+    return max(
+        (
+            piece_value
+            for piece_type, piece_value in PIECE_TYPE_VALUES.items()
+            if board.pieces_mask(piece_type, not board.turn) & targets
+        ),
+        default=0,
+    )
+
+
+def get_best_reply_delta(
+    *,
+    board: Board,
+    capture_bound: int,
+    promotion_bound: int,
+) -> int | None:
+    """Best material delta of the side to move, None when it has no legal moves"""
+
+    best_delta: int | None = None
+    reply_bound = capture_bound + promotion_bound
+
+    # Captures first, nothing else can gain more than a promotion
+    for reply in board.generate_legal_captures():
+        delta = get_move_value_delta(board=board, move=reply)
+
+        if best_delta is None or delta > best_delta:
+            best_delta = delta
+
+            if best_delta >= reply_bound:
+                return best_delta
+
+    if best_delta is not None and best_delta >= promotion_bound:
+        return best_delta
+
+    for reply in board.generate_legal_moves(to_mask=~board.occupied_co[not board.turn]):
+        delta = get_move_value_delta(board=board, move=reply)
+
+        if best_delta is None or delta > best_delta:
+            best_delta = delta
+
+            if best_delta >= promotion_bound:
+                return best_delta
+
+    return best_delta
+
+
+def get_worst_move(*, board: Board, deadline: float | None = None) -> Move | None:
+    """Same move as the max of get_worst_moves, without scoring every reply
+
+    Past the monotonic deadline the worst move found so far is returned.
+    """
+
+    player_value = evaluate_board(board=board, player_color=board.turn)
+
+    worst_move: Move | None = None
+    worst_value = 0
+
+    for player_move in board.legal_moves:
+        if deadline is not None and monotonic() >= deadline:
+            break
+
+        opponent_value = -(
+            player_value + get_move_value_delta(board=board, move=player_move)
+        )
+
+        board.push(player_move)
+
+        try:
+            capture_bound = get_capture_bound(board=board)
+            promotion_bound = get_promotion_bound(board=board)
+
+            # Ties keep the earlier move, so a reply has to beat the current worst
+            if (
+                worst_move is not None
+                and opponent_value + capture_bound + promotion_bound <= worst_value
+            ):
+                continue
+
+            reply_delta = get_best_reply_delta(
+                board=board,
+                capture_bound=capture_bound,
+                promotion_bound=promotion_bound,
+            )
+        finally:
+            board.pop()
+
+        if reply_delta is None:
+            continue
+
+        if worst_move is None or opponent_value + reply_delta > worst_value:
+            worst_move = player_move
+            worst_value = opponent_value + reply_delta
+
+    return worst_move
@@ -0,0 +1,46 @@
+from functools import cached_property
+
+from chess import BLACK, WHITE, Board, Color, Move, SquareSet
+
+from app.util.board_evaluation import (
+    BLACK_SQUARES,
+    SQUARE_COLORS,
+    WHITE_SQUARES,
+    get_pieces_under_attack,
+)
+
+SQUARES_OF_COLOR = {WHITE: WHITE_SQUARES, BLACK: BLACK_SQUARES}
+
+
+class MoveContext:
+    """Move facts of one request, each computed on first use by a filter"""
+
+    def __init__(self: "MoveContext", *, board: Board) -> None:
+        self.board = board
+        self.player_color = board.turn
+
+    @cached_property
+    def captures(self: "MoveContext") -> list[Move]:
+        return list(self.board.generate_legal_captures())
+
+    @cached_property
+    def pieces_under_attack(self: "MoveContext") -> SquareSet:
+        return get_pieces_under_attack(
+            board=self.board,
+            player_color=self.player_color,
+        )
+
+    def get_moves_between_colors(
+        self: "MoveContext",
+        *,
+        from_color: Color,
+        to_color: Color,
+    ) -> list[Move]:
+        # Castling is generated towards the rook, so only the origin is masked
+        return [
+            move
+            for move in self.board.generate_legal_moves(
+                from_mask=SQUARES_OF_COLOR[from_color]
+            )
+            if SQUARE_COLORS[move.to_square] == to_color
+        ]
@@ -1,6 +1,7 @@
 from chess import Board, Move
 
 from app.util.board_evaluation import get_square_color
+from app.util.strategy.context import MoveContext
 
 
 def is_move_from_same_color_to_opposite_color(*, board: Board, move: Move) -> bool:
@@ -10,12 +11,11 @@ def is_move_from_same_color_to_opposite_color(*, board: Board, move: Move) -> bo
     )
 
 
-def filter_moves_from_same_color_to_opposite_color(board: Board) -> list[Move]:
-    return [
-        move
-        for move in list(board.legal_moves)
-        if is_move_from_same_color_to_opposite_color(board=board, move=move)
-    ]
+def filter_moves_from_same_color_to_opposite_color(context: MoveContext) -> list[Move]:
+    return context.get_moves_between_colors(
+        from_color=context.player_color,
+        to_color=not context.player_color,
+    )
 
 
 def is_move_from_opposite_color_to_opposite_color(*, board: Board, move: Move) -> bool:
@@ -25,23 +25,24 @@ def is_move_from_opposite_color_to_opposite_color(*, board: Board, move: Move) -
     )
 
 
-def filter_moves_from_opposite_color_to_opposite_color(board: Board) -> list[Move]:
-    return [
-        move
-        for move in list(board.legal_moves)
-        if is_move_from_opposite_color_to_opposite_color(board=board, move=move)
-    ]
+def filter_moves_from_opposite_color_to_opposite_color(
+    context: MoveContext,
+) -> list[Move]:
+    return context.get_moves_between_colors(
+        from_color=not context.player_color,
+        to_color=not context.player_color,
+    )
 
 
-def filter_dichrome_moves(board: Board) -> list[Move]:
+def filter_dichrome_moves(context: MoveContext) -> list[Move]:
     moves_from_same_color_to_opposite_color = (
         filter_moves_from_same_color_to_opposite_color(
-            board=board,
+            context=context,
         )
     )
     moves_from_opposite_color_to_opposite_color = (
         filter_moves_from_opposite_color_to_opposite_color(
-            board=board,
+            context=context,
         )
     )
 
@@ -1,14 +1,9 @@
-from chess import Board, Move
+from chess import Move
 
-from app.util.board_evaluation import get_pieces_under_attack
+from app.util.strategy.context import MoveContext
 
 
-def filter_elusive_moves(board: Board) -> list[Move]:
-    pieces_under_attack = get_pieces_under_attack(
-        board=board,
-        player_color=board.turn,
+def filter_elusive_moves(context: MoveContext) -> list[Move]:
+    return list(
+        context.board.generate_legal_moves(from_mask=int(context.pieces_under_attack))
     )
-
-    return [
-        move for move in board.legal_moves if move.from_square in pieces_under_attack
-    ]
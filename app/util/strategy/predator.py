@@ -1,5 +1,7 @@
-from chess import Board, Move
+from chess import Move
 
+from app.util.strategy.context import MoveContext
 
-def filter_predator_moves(board: Board) -> list[Move]:
-    return [move for move in board.legal_moves if board.is_capture(move)]
+
+def filter_predator_moves(context: MoveContext) -> list[Move]:
+    return list(context.captures)
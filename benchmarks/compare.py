@@ -0,0 +1,52 @@
+"""Compares the median timings of two benchmark result files
+
+    python -m benchmarks.compare baseline.json current.json --threshold 1.2
+
+Exits with status 1 when a benchmark got slower than the threshold ratio.
+"""
+
+import argparse
+import json
+import sys
+from typing import Any
+
+
+def load_medians(*, path: str) -> dict[tuple[str, str], float]:
+    with open(path) as result_file:
+        report: dict[str, Any] = json.load(result_file)
+
+    medians = {
+        (result["name"], result["position"]): result["median_ms"]
+        for result in report["results"]
+    }
+    medians[(report["load"]["name"], "p50")] = report["load"]["p50_ms"]
+    return medians
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    arguments = parser.parse_args()
+
+    baseline = load_medians(path=arguments.baseline)
+    current = load_medians(path=arguments.current)
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        ratio = current[key] / baseline[key] if baseline[key] else 1.0
+        is_regression = ratio > arguments.threshold
+        regressions += is_regression
+
+        name, position = key
+        print(
+            f"{name:<32} {position:<12} {baseline[key]:>10.3f} ms"
+            f" {current[key]:>10.3f} ms {ratio:>6.2f}x{' !' if is_regression else ''}"
+        )
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
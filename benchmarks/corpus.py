@@ -0,0 +1,43 @@
+from typing import NamedTuple
+
+
+class Position(NamedTuple):
+    name: str
+    fen_string: str
+
+
+# Fixed positions, keep them unchanged so results stay comparable over versions
+POSITIONS = [
+    Position(
+        name="opening",
+        fen_string="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    ),
+    Position(
+        name="italian",
+        fen_string=(
+            "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4"
+        ),
+    ),
+    Position(
+        name="middlegame",
+        fen_string=(
+            "r2q1rk1/pp2bppp/2n1pn2/3p4/3P1B2/2PBPN2/PP1N1PPP/R2QK2R b KQ - 3 9"
+        ),
+    ),
+    Position(
+        name="tactical",
+        fen_string="3k4/3n4/1p6/8/2R1P3/6p1/8/K6Q w - - 0 1",
+    ),
+    Position(
+        name="endgame",
+        fen_string="8/5pk1/6p1/8/3R4/6P1/5PKP/3r4 w - - 0 40",
+    ),
+    Position(
+        name="promotion",
+        fen_string="1r6/2P3k1/8/8/8/8/5p2/K6R w - - 0 1",
+    ),
+    Position(
+        name="en_passant",
+        fen_string="4k3/1P6/8/3pP3/8/8/6p1/4K3 w - d6 0 1",
+    ),
+]
@@ -0,0 +1,96 @@
+"""Times the strategies, evaluation helpers and /compute_move on a fixed corpus
+
+    python -m benchmarks.run --output results.json
+
+Stockfish is replaced by benchmarks/stub_engine.py, which answers at once, so
+the numbers cover this service rather than engine search time.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any
+
+RESULT_FORMAT_VERSION = 1
+
+STUB_ENGINE_PATH = os.path.join(os.path.dirname(__file__), "stub_engine.py")
+
+
+def configure_environment() -> None:
+    os.environ.setdefault("ALLOWED_ORIGIN", "localhost")
+    os.environ["STOCKFISH_PATH"] = STUB_ENGINE_PATH
+    # Cached answers would hide the work being measured
+    os.environ["STOCKFISH_CACHE_SIZE"] = "0"
+    os.environ["SPECULATIVE_MOVE_CACHE_SIZE"] = "0"
+    os.environ.pop("SHARED_CACHE_PATH", None)
+    os.environ.pop("OPENING_BOOK_PATH", None)
+
+
+def get_git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmarks(*, arguments: argparse.Namespace) -> dict[str, Any]:
+    # Settings are read on import, so the app is loaded after configuration
+    from benchmarks.suite import (
+        run_function_benchmarks,
+        run_load_benchmark,
+        run_strategy_benchmarks,
+    )
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    random.seed(arguments.seed)
+
+    return {
+        "version": RESULT_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_revision": get_git_revision(),
+        "python": platform.python_version(),
+        "results": [
+            *run_function_benchmarks(repeat=arguments.repeat),
+            *await run_strategy_benchmarks(repeat=arguments.repeat),
+        ],
+        "load": await run_load_benchmark(
+            requests=arguments.requests,
+            concurrency=arguments.concurrency,
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file, printed to stdout if omitted")
+    arguments = parser.parse_args()
+
+    configure_environment()
+    report = asyncio.run(run_benchmarks(arguments=arguments))
+
+    if arguments.output is None:
+        json.dump(report, sys.stdout, indent=2)
+        return
+
+    with open(arguments.output, "w") as output:
+        json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
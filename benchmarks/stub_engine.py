@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""UCI engine that answers every search at once with the first legal move"""
+
+import sys
+
+from chess import Board
+
+
+def parse_position(*, tokens: list[str]) -> Board:
+    if tokens[1] == "startpos":
+        board = Board()
+        moves = tokens[3:]
+    else:
+        board = Board(fen=" ".join(tokens[2:8]))
+        moves = tokens[9:]
+
+    for move in moves:
+        board.push_uci(move)
+
+    return board
+
+
+def get_bestmove_line(*, board: Board) -> str:
+    move = next(iter(board.legal_moves), None)
+
+    return f"bestmove {move.uci() if move else '(none)'}"
+
+
+def main() -> None:
+    board = Board()
+    is_pondering = False
+
+    for line in sys.stdin:
+        tokens = line.split()
+
+        if not tokens:
+            continue
+
+        command = tokens[0]
+
+        if command == "uci":
+            print("uciok", flush=True)
+        elif command == "isready":
+            print("readyok", flush=True)
+        elif command == "position":
+            board = parse_position(tokens=tokens)
+        elif command == "go" and "ponder" in tokens:
+            is_pondering = True
+        elif command == "go" or (command in ("stop", "ponderhit") and is_pondering):
+            is_pondering = False
+            print(get_bestmove_line(board=board), flush=True)
+        elif command == "quit":
+            break
+
+
+if __name__ == "__main__":
+    main()
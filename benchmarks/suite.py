@@ -0,0 +1,185 @@
+import asyncio
+import statistics
+import time
+from collections.abc import Callable
+
+import httpx
+from chess import Board, piece_symbol, square_name
+
+from app.util.board_evaluation import evaluate_board
+from app.util.execute import STRATEGY_FUNCTIONS, execute_move
+from app.util.fish.init_fish import get_engine_checkout, init_stockfish, stockfish_pool
+from app.util.fish.uci import UciEngine
+from app.util.schema import ChessMove, StrategyName, StrategyRequest
+from app.util.strategy.checkmate_express import get_worst_moves
+from benchmarks.corpus import POSITIONS, Position
+from main import app
+
+Result = dict[str, str | int | float]
+
+LOAD_STRATEGIES: list[StrategyName] = [*STRATEGY_FUNCTIONS, "stockfish-10"]
+
+
+def summarize(*, name: str, position: str, durations: list[float]) -> Result:
+    return {
+        "name": name,
+        "position": position,
+        "runs": len(durations),
+        "mean_ms": statistics.fmean(durations) * 1000,
+        "median_ms": statistics.median(durations) * 1000,
+        "min_ms": min(durations) * 1000,
+        "max_ms": max(durations) * 1000,
+    }
+
+
+def time_calls(*, fn: Callable[[], object], repeat: int) -> list[float]:
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - started_at)
+    return durations
+
+
+def get_first_chess_move(*, board: Board) -> ChessMove:
+    move = next(iter(board.legal_moves))
+
+    return ChessMove(
+        from_square=square_name(move.from_square),
+        to_square=square_name(move.to_square),
+        promotion=piece_symbol(move.promotion) if move.promotion else None,
+    )
+
+
+def run_function_benchmarks(*, repeat: int) -> list[Result]:
+    results: list[Result] = []
+    for position in POSITIONS:
+        board = Board(fen=position.fen_string)
+        strategy_request = StrategyRequest(
+            fen_string=position.fen_string,
+            strategy_name="random-move",
+        )
+        chess_move = get_first_chess_move(board=board)
+
+        benchmarks: dict[str, Callable[[], object]] = {
+            "evaluate_board": lambda: evaluate_board(
+                board=board,
+                player_color=board.turn,
+            ),
+            "get_worst_moves": lambda: get_worst_moves(
+                board=board,
+                player_moves=list(board.legal_moves),
+            ),
+            "execute_move": lambda: execute_move(
+                chess_move=chess_move,
+                strategy_request=strategy_request,
+            ),
+        }
+
+        results.extend(
+            summarize(
+                name=name,
+                position=position.name,
+                durations=time_calls(fn=fn, repeat=repeat),
+            )
+            for name, fn in benchmarks.items()
+        )
+    return results
+
+
+async def time_strategy(
+    *,
+    stockfish: UciEngine,
+    strategy_name: StrategyName,
+    position: Position,
+    repeat: int,
+) -> Result:
+    strategy_function, probability = STRATEGY_FUNCTIONS[strategy_name]
+    board = Board(fen=position.fen_string)
+    engine_checkout = get_engine_checkout(stockfish=stockfish)
+
+    durations = []
+    for _ in range(repeat):
+        # Strategies may push moves while searching, each run gets its own board
+        run_board = board.copy(stack=False)
+
+        started_at = time.perf_counter()
+        await strategy_function(
+            engine_checkout, run_board, position.fen_string, probability
+        )
+        durations.append(time.perf_counter() - started_at)
+
+    return summarize(
+        name=f"strategy/{strategy_name}",
+        position=position.name,
+        durations=durations,
+    )
+
+
+async def run_strategy_benchmarks(*, repeat: int) -> list[Result]:
+    stockfish = await init_stockfish()
+
+    try:
+        return [
+            await time_strategy(
+                stockfish=stockfish,
+                strategy_name=strategy_name,
+                position=position,
+                repeat=repeat,
+            )
+            for strategy_name in STRATEGY_FUNCTIONS
+            for position in POSITIONS
+        ]
+    finally:
+        await stockfish.quit()
+
+
+async def run_load_benchmark(*, requests: int, concurrency: int) -> Result:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send_request(client: httpx.AsyncClient, index: int) -> float | None:
+        position = POSITIONS[index % len(POSITIONS)]
+        strategy_name = LOAD_STRATEGIES[index % len(LOAD_STRATEGIES)]
+
+        async with semaphore:
+            started_at = time.perf_counter()
+            response = await client.post(
+                "/compute_move",
+                json={
+                    "fen_string": position.fen_string,
+                    "strategy_name": strategy_name,
+                },
+            )
+            duration = time.perf_counter() - started_at
+
+        return duration if response.status_code == 200 else None
+
+    await stockfish_pool.start()
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),  # type: ignore[arg-type]
+            base_url="http://benchmark",
+        ) as client:
+            started_at = time.perf_counter()
+            durations = await asyncio.gather(
+                *(send_request(client, index) for index in range(requests))
+            )
+            elapsed = time.perf_counter() - started_at
+    finally:
+        await stockfish_pool.close()
+
+    latencies = sorted(duration for duration in durations if duration is not None)
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+
+    return {
+        "name": "http/compute_move",
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": requests - len(latencies),
+        "throughput_rps": requests / elapsed,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0,
+        "p50_ms": quantiles[49] * 1000 if quantiles else 0,
+        "p95_ms": quantiles[94] * 1000 if quantiles else 0,
+        "p99_ms": quantiles[98] * 1000 if quantiles else 0,
+    }
@@ -3,7 +3,10 @@ from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
 
 from app.route.chess import chess_router
+from app.route.game import game_router
 from app.route.health import health_router
+from app.route.metrics import metrics_router
+from app.util.fish.init_fish import stockfish_pool
 from app.util.settings import api_settings
 
 app = FastAPI()
@@ -15,8 +18,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.on_event("startup")
+async def start_stockfish_pool() -> None:
+    await stockfish_pool.start()
+
+
+@app.on_event("shutdown")
+async def close_stockfish_pool() -> None:
+    await stockfish_pool.close()
+
+
 app.include_router(chess_router)
+app.include_router(game_router)
 app.include_router(health_router)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     uvicorn.run(
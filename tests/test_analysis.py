@@ -0,0 +1,133 @@
+import json
+from collections.abc import AsyncGenerator
+
+from chess import Board
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+
+from app.util.fish.uci import BestMove, SearchInfo, UciEngine, UciError
+from app.util.schema import SearchLimit
+from main import app
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def get_uci(*, candidate_move: dict[str, dict[str, str | None]]) -> str:
+    chess_move = candidate_move["chess_move"]
+
+    return f"{chess_move['from_square']}{chess_move['to_square']}"
+
+
+def test_analyze_position() -> None:
+    board = Board(fen=STARTING_FEN)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/analyze_position",
+            json={
+                "fen_string": STARTING_FEN,
+                "strategy_name": "stockfish-depth-5",
+                "multipv": 3,
+            },
+        )
+
+    assert response.status_code == 200
+
+    candidate_moves = response.json()["candidate_moves"]
+
+    assert [candidate_move["rank"] for candidate_move in candidate_moves] == [1, 2, 3]
+    assert len({get_uci(candidate_move=move) for move in candidate_moves}) == 3
+
+    for candidate_move in candidate_moves:
+        assert candidate_move["depth"] > 0
+        assert candidate_move["score_cp"] is not None
+        assert board.is_legal(board.parse_uci(get_uci(candidate_move=candidate_move)))
+
+
+def test_analyze_position_streams_search_progress() -> None:
+    with TestClient(app) as client:
+        response = client.post(
+            "/analyze_position?stream=true",
+            json={
+                "fen_string": "k7/8/8/8/8/8/1R6/1R5K w - - 0 1",
+                "strategy_name": "stockfish-nodes-10000",
+                "multipv": 2,
+            },
+        )
+
+    assert response.status_code == 200
+
+    *progress, final = [json.loads(line) for line in response.text.splitlines()]
+
+    assert progress
+    assert all(message["candidate_move"] is not None for message in progress)
+    assert final["candidate_move"] is None
+    assert len(final["analysis_outcome"]["candidate_moves"]) == 2
+
+
+def test_analyze_position_rejects_other_strategies() -> None:
+    with TestClient(app) as client:
+        over_limit = client.post(
+            "/analyze_position",
+            json={"fen_string": STARTING_FEN, "multipv": 500},
+        )
+        not_stockfish = client.post(
+            "/analyze_position",
+            json={"fen_string": STARTING_FEN, "strategy_name": "predator"},
+        )
+        checkmate = client.post(
+            "/analyze_position",
+            json={"fen_string": "k7/1Q6/1K6/8/8/8/8/8 b - - 0 1"},
+        )
+
+    assert over_limit.status_code == 422
+    assert not_stockfish.status_code == 422
+    assert checkmate.json() == {
+        "candidate_moves": [],
+        "game_outcome": {"winner": "white", "reason": "checkmate"},
+    }
+
+
+def test_failed_analysis_restarts_the_engine(monkeypatch: MonkeyPatch) -> None:
+    quit_engines: list[UciEngine] = []
+    quit_engine = UciEngine.quit
+    analyze = UciEngine.analyze
+
+    async def failing_analyze(
+        stockfish: UciEngine,
+        *,
+        fen_string: str,
+        search_limit: SearchLimit,
+        multipv: int,
+    ) -> AsyncGenerator[SearchInfo | BestMove, None]:
+        # Reports progress, then never settles on a best move
+        async for search_update in analyze(
+            stockfish,
+            fen_string=fen_string,
+            search_limit=search_limit,
+            multipv=multipv,
+        ):
+            if isinstance(search_update, SearchInfo):
+                yield search_update
+
+        raise UciError("Engine did not return a best move in time")
+
+    async def spy_quit(stockfish: UciEngine) -> None:
+        quit_engines.append(stockfish)
+        await quit_engine(stockfish)
+
+    monkeypatch.setattr(UciEngine, "analyze", failing_analyze)
+    monkeypatch.setattr(UciEngine, "quit", spy_quit)
+
+    with TestClient(app, raise_server_exceptions=False) as client:
+        response = client.post(
+            "/analyze_position",
+            json={
+                "fen_string": "k7/8/8/8/3P4/8/8/K7 w - - 0 1",
+                "strategy_name": "stockfish-100",
+                "multipv": 2,
+            },
+        )
+
+        assert response.status_code == 500
+        assert len(quit_engines) == 1
@@ -0,0 +1,67 @@
+from chess import Board
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+
+from app.util import execute
+from app.util.fish import init_fish
+from app.util.fish.scheduler import EngineScheduler
+from main import app
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def test_compute_moves() -> None:
+    strategy_requests = [
+        {"fen_string": STARTING_FEN, "strategy_name": "random-move"},
+        {"fen_string": "not a fen", "strategy_name": "random-move"},
+        {"fen_string": "k7/8/8/8/8/8/4P3/K7 w - - 0 1", "strategy_name": "predator"},
+        {"fen_string": "k7/1Q6/1K6/8/8/8/8/8 b - - 0 1", "strategy_name": "elusive"},
+    ]
+
+    with TestClient(app) as client:
+        response = client.post("/compute_moves", json=strategy_requests)
+
+    assert response.status_code == 200
+
+    random_move, invalid_fen, predator_move, checkmate = response.json()
+
+    assert random_move["move_outcome"]["chess_move"] is not None
+    assert invalid_fen["move_outcome"] is None
+    assert invalid_fen["error"]
+    assert predator_move["move_outcome"]["chess_move"] is not None
+    assert checkmate["move_outcome"]["game_outcome"] == {
+        "winner": "white",
+        "reason": "checkmate",
+    }
+
+
+def test_batches_larger_than_the_engine_queue(monkeypatch: MonkeyPatch) -> None:
+    engine_scheduler = EngineScheduler(
+        max_concurrent=1,
+        queue_size=2,
+        queue_timeout=5,
+    )
+    monkeypatch.setattr(init_fish, "engine_scheduler", engine_scheduler)
+    monkeypatch.setattr(execute, "engine_scheduler", engine_scheduler)
+
+    # Distinct positions, so every item reaches the engine instead of the cache
+    board = Board()
+    strategy_requests = []
+    for move_uci in ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6", "d2d3", "f8c5"]:
+        board.push_uci(move_uci)
+        strategy_requests.append(
+            {"fen_string": board.fen(), "strategy_name": "stockfish-10"}
+        )
+
+    with TestClient(app) as client:
+        response = client.post("/compute_moves", json=strategy_requests)
+
+    assert response.status_code == 200
+
+    batch_move_outcomes = response.json()
+
+    assert len(batch_move_outcomes) > engine_scheduler.queue_size
+    assert all(
+        batch_move_outcome["move_outcome"]["chess_move"] is not None
+        for batch_move_outcome in batch_move_outcomes
+    )
@@ -0,0 +1,13 @@
+from app.util.board_cache import get_board
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def test_cached_boards_are_copies() -> None:
+    board = get_board(fen_string=STARTING_FEN)
+    board.push_uci("e2e4")
+
+    cached_board = get_board(fen_string=STARTING_FEN)
+
+    assert cached_board is not board
+    assert cached_board.fen() == STARTING_FEN
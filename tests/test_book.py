@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from chess import Board, Move
+from chess.polyglot import open_reader, zobrist_hash
+
+from app.util.fish.book import get_book_move
+
+
+def encode_entry(*, board: Board, move: Move, weight: int) -> bytes:
+    raw_move = (
+        move.to_square & 0x3F
+        | (move.from_square & 0x3F) << 6
+        | (move.promotion - 1 if move.promotion else 0) << 12
+    )
+    return b"".join(
+        [
+            zobrist_hash(board).to_bytes(8, "big"),
+            raw_move.to_bytes(2, "big"),
+            weight.to_bytes(2, "big"),
+            bytes(4),
+        ]
+    )
+
+
+def test_get_book_move(tmp_path: Path) -> None:
+    board = Board()
+    path = tmp_path / "book.bin"
+    path.write_bytes(
+        encode_entry(board=board, move=Move.from_uci("e2e4"), weight=10)
+        + encode_entry(board=board, move=Move.from_uci("d2d4"), weight=5)
+    )
+
+    with open_reader(path) as book:
+        assert get_book_move(
+            book=book,
+            board=board,
+            strategy_name="stockfish-1000",
+        ) == Move.from_uci("e2e4")
+        assert get_book_move(
+            book=book,
+            board=board,
+            strategy_name="stockfish-1",
+        ) in (Move.from_uci("e2e4"), Move.from_uci("d2d4"))
+
+        board.push_uci("e2e4")
+
+        assert (
+            get_book_move(
+                book=book,
+                board=board,
+                strategy_name="stockfish-1000",
+            )
+            is None
+        )
@@ -0,0 +1,53 @@
+from app.util.cache import CacheStats, LruCache
+
+
+class FakeClock:
+    def __init__(self: "FakeClock") -> None:
+        self.now = 0.0
+
+    def __call__(self: "FakeClock") -> float:
+        return self.now
+
+
+def test_least_recently_used_is_evicted() -> None:
+    cache: LruCache[str, int] = LruCache(capacity=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+    stats = cache.stats()
+
+    assert stats.hits == 3
+    assert stats.misses == 1
+    assert stats.size == 2
+
+
+def test_expired_entry_is_a_miss() -> None:
+    clock = FakeClock()
+    cache: LruCache[str, int] = LruCache(capacity=2, ttl=10, clock=clock)
+
+    cache.set("a", 1)
+    clock.now = 10
+
+    assert cache.get("a") == 1
+
+    clock.now = 10.5
+
+    assert cache.get("a") is None
+    assert cache.stats() == CacheStats(hits=1, misses=1, size=0)
+
+
+def test_zero_capacity_disables_cache() -> None:
+    cache: LruCache[str, int] = LruCache(capacity=0)
+
+    cache.set("a", 1)
+
+    assert cache.get("a") is None
@@ -1,6 +1,21 @@
-from chess import BLACK, SQUARES, WHITE, Board, Move
+from chess import (
+    BLACK,
+    D1,
+    SQUARES,
+    WHITE,
+    Board,
+    Move,
+    SquareSet,
+    square_file,
+    square_rank,
+)
 
-from app.util.board_evaluation import get_square_color, is_black_square, is_white_square
+from app.util.board_evaluation import (
+    get_pieces_under_attack,
+    get_square_color,
+    is_black_square,
+    is_white_square,
+)
 from app.util.strategy.dichrome import (
     is_move_from_opposite_color_to_opposite_color,
     is_move_from_same_color_to_opposite_color,
@@ -30,6 +45,17 @@ def test_square_color() -> None:
     assert len(white_colors) == 32
     assert white_colors == [WHITE] * 32
 
+    for square in SQUARES:
+        assert is_white_square(square=square) == (
+            (square_file(square) + square_rank(square)) % 2 != 0
+        )
+
+
+def test_get_pieces_under_attack() -> None:
+    board = Board(fen="k2r4/8/8/8/8/8/1n6/K2R3B w - - 0 1")
+
+    assert get_pieces_under_attack(board=board, player_color=WHITE) == SquareSet([D1])
+
 
 def test_is_move_from_opposite_color_to_same_color() -> None:
     board = Board(fen="rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import cast
+
+from chess import Board
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+
+from app.util import execute
+from app.util.deadline import current_deadline, get_deadline_movetime, start_deadline
+from app.util.fish.uci import BestMove, UciEngine
+from app.util.move import choose_random_move, get_stockfish_move
+from app.util.schema import MoveOutcome, SearchLimit, StrategyName
+from app.util.strategy.checkmate_express import get_worst_move
+from main import app
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def test_movetime_shrinks_to_the_remaining_budget() -> None:
+    start_deadline(deadline_ms=None)
+    assert get_deadline_movetime(movetime=1000) == 1000
+
+    start_deadline(deadline_ms=50)
+    assert get_deadline_movetime(movetime=10) == 10
+    assert get_deadline_movetime(movetime=1000) <= 50
+
+    start_deadline(deadline_ms=1)
+    time.sleep(0.01)
+    assert get_deadline_movetime(movetime=1000) == 1
+
+    current_deadline.set(None)
+
+
+def test_checkmate_express_stops_at_the_deadline() -> None:
+    board = Board(fen=STARTING_FEN)
+
+    assert get_worst_move(board=board, deadline=time.monotonic() + 60) is not None
+    assert get_worst_move(board=board, deadline=time.monotonic() - 1) is None
+
+
+def test_spent_budget_falls_back_to_a_cheap_move(monkeypatch: MonkeyPatch) -> None:
+    fallback_boards: list[Board] = []
+    engine_searches: list[str] = []
+
+    def spy_random_move(*, board: Board) -> MoveOutcome:
+        fallback_boards.append(board)
+        return choose_random_move(board=board)
+
+    async def spy_search(
+        _stockfish: UciEngine,
+        *,
+        fen_string: str,
+        search_limit: SearchLimit,
+    ) -> BestMove:
+        engine_searches.append(fen_string)
+        raise AssertionError("The engine searched despite the spent budget")
+
+    monkeypatch.setattr(execute, "choose_random_move", spy_random_move)
+    monkeypatch.setattr(UciEngine, "search", spy_search)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/compute_move",
+            json={
+                "fen_string": STARTING_FEN,
+                "strategy_name": "stockfish-1000",
+                "deadline_ms": 1,
+            },
+        )
+
+    assert response.status_code == 200
+    assert response.json()["chess_move"] is not None
+    assert len(fallback_boards) == 1
+    assert not engine_searches
+
+
+class FakeStockfish:
+    def __init__(self: "FakeStockfish") -> None:
+        self.movetimes: list[int | None] = []
+
+    async def search(
+        self: "FakeStockfish",
+        *,
+        fen_string: str,
+        search_limit: SearchLimit,
+    ) -> BestMove:
+        self.movetimes.append(search_limit.movetime)
+        return BestMove(move="e2e4", ponder=None)
+
+
+def test_queue_wait_is_taken_out_of_the_movetime() -> None:
+    async def run() -> None:
+        stockfish = FakeStockfish()
+        only_engine = asyncio.Lock()
+
+        @asynccontextmanager
+        async def engine_checkout(
+            _strategy_name: StrategyName,
+        ) -> AsyncIterator[UciEngine]:
+            async with only_engine:
+                yield cast(UciEngine, stockfish)
+
+        async def search() -> MoveOutcome:
+            start_deadline(deadline_ms=700)
+            return await get_stockfish_move(
+                engine_checkout=engine_checkout,
+                strategy_name="stockfish-1000",
+                fen_string="k7/8/8/3p4/8/8/4P3/K7 w - - 0 1",
+            )
+
+        async with only_engine:
+            waiting = asyncio.create_task(search())
+            await asyncio.sleep(0.3)
+
+        move_outcome = await waiting
+
+        assert move_outcome.chess_move is not None
+        assert stockfish.movetimes[0] is not None
+        assert stockfish.movetimes[0] <= 400
+
+    asyncio.run(run())
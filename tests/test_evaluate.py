@@ -1,10 +1,18 @@
-from chess import BLACK, WHITE, Board
+from chess import BLACK, WHITE, Board, Move
+from pytest import MonkeyPatch
 
+from app.util import board_evaluation
 from app.util.board_evaluation import (
     count_opponent_pieces,
     evaluate_and_get_optimal_move,
     evaluate_board,
+    evaluate_packed_boards,
+    get_move_based_on_value,
+    get_move_value_delta,
+    get_move_values,
+    pack_board,
 )
+from app.util.strategy.checkmate_express import get_worst_move, get_worst_moves
 
 
 def test_evaluate_board() -> None:
@@ -67,8 +75,81 @@ def test_simulate_move_and_evaluate() -> None:
     assert board.fen() == ending_fen
 
 
+def test_get_move_value_delta() -> None:
+    board = Board(fen="3qk3/2P5/8/3pP3/8/8/8/4K2R w K d6 0 1")
+
+    moves = {
+        "e5e6": 0,
+        "e5d6": 1,
+        "c7c8q": 8,
+        "c7c8n": 2,
+        "c7d8q": 17,
+        "e1g1": 0,
+    }
+
+    for move_uci, delta in moves.items():
+        move = Move.from_uci(move_uci)
+        hypothetical_board = board.copy(stack=False)
+        hypothetical_board.push(move)
+
+        assert get_move_value_delta(board=board, move=move) == delta
+        assert evaluate_board(board=hypothetical_board, player_color=WHITE) == (
+            evaluate_board(board=board, player_color=WHITE) + delta
+        )
+
+
 def test_count_opponent_pieces() -> None:
     board = Board(fen="k1qrb2P/2p3p1/2P1P1P1/2P5/P2p4/4PPp1/8/K4P2 w - - 0 1")
 
     assert count_opponent_pieces(board=board, player_color=BLACK) == 10
     assert count_opponent_pieces(board=board, player_color=WHITE) == 8
+
+
+def test_get_worst_move() -> None:
+    fens = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4",
+        "3k4/3n4/1p6/8/2R1P3/6p1/8/K6Q w - - 0 1",
+        "ppP5/kpP1n3/ppP5/PPP5/1p3Q2/5p2/8/K1R3P1 w - - 1 1",
+        "4k3/1P6/8/3pP3/8/8/6p1/4K3 w - d6 0 1",
+    ]
+
+    for fen in fens:
+        board = Board(fen=fen)
+        worst_moves = get_worst_moves(board=board, player_moves=list(board.legal_moves))
+
+        assert get_worst_move(board=board) == get_move_based_on_value(
+            move_values=worst_moves,
+            fn=max,
+        )
+        assert board.fen() == fen
+
+
+def test_batch_evaluation() -> None:
+    fens = [
+        "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+        "3k4/3n4/1p6/8/2R1P3/6p1/8/K6Q b - - 0 1",
+        "4k3/1P6/8/3pP3/8/8/6p1/4K3 w - d6 0 1",
+    ]
+
+    for fen in fens:
+        board = Board(fen=fen)
+        moves = list(board.legal_moves)
+
+        assert evaluate_packed_boards(
+            packed_boards=[pack_board(board=board)],
+            player_color=BLACK,
+        ) == [evaluate_board(board=board, player_color=BLACK)]
+        assert get_move_values(board=board, moves=moves, batch=True) == (
+            get_move_values(board=board, moves=moves, batch=False)
+        )
+        assert get_worst_moves(board=board, player_moves=moves, batch=True) == (
+            get_worst_moves(board=board, player_moves=moves)
+        )
+        assert board.fen() == fen
+
+
+def test_batch_evaluation_without_numpy(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(board_evaluation, "np", None)
+
+    test_batch_evaluation()
@@ -0,0 +1,78 @@
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+
+from app.util import game_session
+from app.util.fish.scheduler import EngineBusyError
+from app.util.schema import MoveOutcome
+from main import app
+
+
+def test_game_session() -> None:
+    with TestClient(app) as client, client.websocket_connect("/game") as websocket:
+        websocket.send_json(
+            {
+                "fen_string": "k7/8/8/8/8/8/1R6/1R5K w - - 0 1",
+                "strategy_name": "random-move",
+            }
+        )
+
+        websocket.send_text("b2b3")
+        bot_move = websocket.receive_json()
+
+        assert bot_move["error"] is None
+        assert bot_move["move_outcome"]["chess_move"]["from_square"] == "a8"
+
+        websocket.send_text("h1h3")
+        invalid_move = websocket.receive_json()
+
+        assert invalid_move["error"] == "Invalid move"
+
+
+def test_game_session_ends_on_checkmate() -> None:
+    with TestClient(app) as client, client.websocket_connect("/game") as websocket:
+        websocket.send_json(
+            {
+                "fen_string": "k7/8/1K6/8/8/8/8/7Q w - - 0 1",
+                "strategy_name": "checkmate-express",
+            }
+        )
+
+        websocket.send_text("h1h8")
+
+        assert websocket.receive_json()["move_outcome"] == {
+            "chess_move": None,
+            "game_outcome": {"winner": "white", "reason": "checkmate"},
+            "fen_string": "k6Q/8/1K6/8/8/8/8/8 b - - 1 1",
+        }
+
+
+def test_game_session_takes_back_player_move_on_bot_error(
+    monkeypatch: MonkeyPatch,
+) -> None:
+    async def fail_strategy_move(**_kwargs: object) -> MoveOutcome:
+        raise EngineBusyError(
+            "Engine queue is full",
+            status_code=HTTP_429_TOO_MANY_REQUESTS,
+            retry_after=1,
+        )
+
+    with TestClient(app) as client, client.websocket_connect("/game") as websocket:
+        websocket.send_json(
+            {
+                "fen_string": "k7/8/8/8/8/8/1R6/1R5K w - - 0 1",
+                "strategy_name": "random-move",
+            }
+        )
+
+        with monkeypatch.context() as patch:
+            patch.setattr(game_session, "compute_strategy_move", fail_strategy_move)
+            websocket.send_text("b2b3")
+
+            assert websocket.receive_json()["error"] == "Engine queue is full"
+
+        websocket.send_text("b2b3")
+        bot_move = websocket.receive_json()
+
+        assert bot_move["error"] is None
+        assert bot_move["move_outcome"]["chess_move"]["from_square"] == "a8"
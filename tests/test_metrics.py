@@ -0,0 +1,55 @@
+from fastapi.testclient import TestClient
+
+from app.util.metrics import Histogram, registry
+from main import app
+
+
+def test_histogram_render() -> None:
+    histogram = Histogram(
+        name="test_duration_seconds",
+        description="Test histogram",
+        label_names=("stage",),
+        buckets=(0.1, 1.0),
+    )
+    registry.remove(histogram)
+
+    histogram.observe(0.5, stage='fen "parse"')
+
+    assert histogram.render() == [
+        "# HELP test_duration_seconds Test histogram",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{stage="fen \\"parse\\"",le="0.1"} 0',
+        'test_duration_seconds_bucket{stage="fen \\"parse\\"",le="1.0"} 1',
+        'test_duration_seconds_bucket{stage="fen \\"parse\\"",le="+Inf"} 1',
+        'test_duration_seconds_sum{stage="fen \\"parse\\""} 0.5',
+        'test_duration_seconds_count{stage="fen \\"parse\\""} 1',
+    ]
+
+
+def test_metrics_route() -> None:
+    with TestClient(app) as client:
+        client.post(
+            "/compute_move",
+            json={
+                "fen_string": "k7/8/8/8/8/8/4P3/K7 w - - 0 1",
+                "strategy_name": "predator",
+            },
+        )
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'chess_strategy_duration_seconds_count{strategy_name="predator"}' in (
+        response.text
+    )
+    assert (
+        'chess_stockfish_fallbacks_total{strategy_name="predator",reason="lone_king"}'
+        in response.text
+    )
+    assert (
+        'chess_stage_duration_seconds_count{strategy_name="predator",'
+        'stage="engine_queue"}' in response.text
+    )
+    assert "chess_stockfish_pool_size" in response.text
+    assert 'chess_cache_hit_ratio{cache="board"}' in response.text
+    assert "# TYPE chess_cache_hits_total counter" in response.text
+    assert 'chess_cache_misses_total{cache="board"}' in response.text
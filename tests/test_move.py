@@ -1,9 +1,12 @@
-from collections.abc import Callable
+import asyncio
+from collections.abc import Awaitable, Callable
 
 from chess import Board, Move, parse_square
-from stockfish import Stockfish
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
 
-from app.util.fish.get_fish import get_stockfish
+from app.util.fish import init_fish
+from app.util.fish.init_fish import EngineCheckout, get_engine_checkout, init_stockfish
 from app.util.helper import get_piece_type
 from app.util.move import (
     get_checkmate_express_move,
@@ -12,19 +15,36 @@ from app.util.move import (
     get_monochrome_move,
     get_predator_move,
 )
-from app.util.schema import MoveOutcome
+from app.util.schema import MoveOutcome, StrategyName
+from main import app
+
+
+async def compute_move(
+    get_move: Callable[[EngineCheckout, Board, str, float], Awaitable[MoveOutcome]],
+    board: Board,
+) -> MoveOutcome:
+    stockfish = await init_stockfish()
+    stockfish_move_prob = 0
+
+    try:
+        return await get_move(
+            get_engine_checkout(stockfish=stockfish),
+            board,
+            board.fen(),
+            stockfish_move_prob,
+        )
+    finally:
+        await stockfish.quit()
 
 
 def execute_move(
-    get_move: Callable[[Stockfish, Board, float], MoveOutcome],
+    get_move: Callable[[EngineCheckout, Board, str, float], Awaitable[MoveOutcome]],
     starting_fen: str,
     ending_fen: str,
 ) -> bool:
     board = Board(fen=starting_fen)
-    stockfish = get_stockfish()
-    stockfish_move_prob = 0
 
-    move = get_move(stockfish, board, stockfish_move_prob)
+    move = asyncio.run(compute_move(get_move=get_move, board=board))
 
     if not move.chess_move:
         raise Exception("No best move found")
@@ -133,3 +153,23 @@ def test_get_checkmate_express_move() -> None:
         starting_fen=starting_fen,
         ending_fen=ending_fen,
     )
+
+
+def test_python_strategies_do_not_take_an_engine(monkeypatch: MonkeyPatch) -> None:
+    def refuse_checkout(*, strategy_name: StrategyName, fen_string: str) -> None:
+        raise AssertionError(f"{strategy_name} took an engine")
+
+    monkeypatch.setattr(init_fish, "checkout_stockfish", refuse_checkout)
+
+    with TestClient(app) as client:
+        for strategy_name in ["random-move", "checkmate-express"]:
+            response = client.post(
+                "/compute_move",
+                json={
+                    "fen_string": "3k4/3n4/1p6/8/2R1P3/6p1/8/K6Q w - - 0 1",
+                    "strategy_name": strategy_name,
+                },
+            )
+
+            assert response.status_code == 200
+            assert response.json()["chess_move"] is not None
@@ -0,0 +1,46 @@
+from chess import BLACK, WHITE, Board, Move, SquareSet
+
+from app.util.strategy.context import MoveContext
+from app.util.strategy.elusive import filter_elusive_moves
+from app.util.strategy.predator import filter_predator_moves
+
+
+def is_light_square(*, square: int) -> bool:
+    return (square % 8 + square // 8) % 2 == 1
+
+
+def test_move_context() -> None:
+    context = MoveContext(board=Board(fen="k2r4/8/8/8/8/8/8/K2R4 w - - 0 1"))
+
+    assert context.captures == [Move.from_uci("d1d8")]
+    assert context.pieces_under_attack == SquareSet.from_square(3)
+    assert Move.from_uci("a1b1") in context.get_moves_between_colors(
+        from_color=BLACK,
+        to_color=WHITE,
+    )
+    assert filter_predator_moves(context) == [Move.from_uci("d1d8")]
+    assert len(filter_elusive_moves(context)) == 13
+
+
+def test_filters_match_legal_move_order() -> None:
+    board = Board(
+        fen="r1bqk2r/pppp1ppp/2n2n2/2b1p3/2B1P3/2N2N2/PPPP1PPP/R1BQK2R w KQkq - 4 5"
+    )
+    context = MoveContext(board=board)
+
+    assert filter_predator_moves(context) == [
+        move for move in board.legal_moves if board.is_capture(move)
+    ]
+
+    for from_color in [WHITE, BLACK]:
+        for to_color in [WHITE, BLACK]:
+            # Castling e1g1 goes from a dark square to a dark square
+            assert context.get_moves_between_colors(
+                from_color=from_color,
+                to_color=to_color,
+            ) == [
+                move
+                for move in board.legal_moves
+                if is_light_square(square=move.from_square) == from_color
+                and is_light_square(square=move.to_square) == to_color
+            ]
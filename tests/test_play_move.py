@@ -0,0 +1,38 @@
+import pytest
+from chess import Board, Move
+
+from app.util.execute import get_legal_move, play_move
+from app.util.schema import ChessMove
+
+
+def test_get_legal_move_normalizes_promotion() -> None:
+    board = Board()
+
+    assert get_legal_move(board=board, move=Move.from_uci("e2e4q")) == Move.from_uci(
+        "e2e4"
+    )
+
+    with pytest.raises(Exception, match="Invalid move"):
+        get_legal_move(board=board, move=Move.from_uci("e2e5"))
+
+    board = Board(fen="k7/4P3/8/8/8/8/8/K7 w - - 0 1")
+
+    assert get_legal_move(board=board, move=Move.from_uci("e7e8n")) == Move.from_uci(
+        "e7e8n"
+    )
+
+    with pytest.raises(Exception, match="Invalid move"):
+        get_legal_move(board=board, move=Move.from_uci("e7e8"))
+
+
+def test_play_move_returns_fen() -> None:
+    move_outcome = play_move(
+        board=Board(),
+        chess_move=ChessMove(from_square="e2", to_square="e4", promotion="q"),
+    )
+
+    assert move_outcome.chess_move == ChessMove(from_square="e2", to_square="e4")
+    assert (
+        move_outcome.fen_string
+        == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+    )
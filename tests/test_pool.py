@@ -0,0 +1,100 @@
+import asyncio
+from typing import cast
+
+from app.util.fish.pool import StockfishPool
+from app.util.fish.uci import UciError
+
+
+class FakeStockfish:
+    def __init__(self: "FakeStockfish") -> None:
+        self.is_alive = True
+        self.ponder_fen: str | None = None
+
+    @property
+    def is_pondering(self: "FakeStockfish") -> bool:
+        return self.ponder_fen is not None
+
+    def is_pondering_on(self: "FakeStockfish", *, fen_string: str) -> bool:
+        return self.ponder_fen == fen_string
+
+    async def quit(self: "FakeStockfish") -> None:
+        self.is_alive = False
+
+
+async def init_fake_stockfish() -> FakeStockfish:
+    return FakeStockfish()
+
+
+async def start_pool(*, size: int) -> StockfishPool:
+    pool = StockfishPool(size=size, init_stockfish=init_fake_stockfish)  # type: ignore
+    await pool.start()
+    return pool
+
+
+def test_checkout_is_exclusive() -> None:
+    async def run() -> None:
+        pool = await start_pool(size=2)
+
+        async with pool.checkout() as first, pool.checkout() as second:
+            assert first is not second
+
+            async def checkout_third() -> object:
+                async with pool.checkout() as stockfish:
+                    return stockfish
+
+            waiting = asyncio.create_task(checkout_third())
+            await asyncio.sleep(0.01)
+
+            assert not waiting.done()
+
+        assert await waiting in (first, second)
+
+    asyncio.run(run())
+
+
+def test_crashed_stockfish_is_restarted() -> None:
+    async def run() -> None:
+        pool = await start_pool(size=1)
+
+        async with pool.checkout() as stockfish:
+            await stockfish.quit()
+
+        async with pool.checkout() as restarted:
+            assert restarted is not stockfish
+            assert restarted.is_alive
+
+    asyncio.run(run())
+
+
+def test_stockfish_is_restarted_after_engine_error() -> None:
+    async def run() -> None:
+        pool = await start_pool(size=1)
+
+        try:
+            async with pool.checkout() as stockfish:
+                raise UciError("Engine process exited")
+        except UciError:
+            pass
+
+        async with pool.checkout() as restarted:
+            assert restarted is not stockfish
+
+    asyncio.run(run())
+
+
+def test_checkout_prefers_pondering_stockfish() -> None:
+    async def run() -> None:
+        pool = await start_pool(size=3)
+        fen_string = "8/8/8/8/8/8/8/K6k w - - 0 1"
+
+        async with pool.checkout() as other, pool.checkout() as pondering:
+            cast(FakeStockfish, other).ponder_fen = "8/8/8/8/8/8/8/K5k1 w - - 0 1"
+            cast(FakeStockfish, pondering).ponder_fen = fen_string
+
+        async with pool.checkout(fen_string=fen_string) as stockfish:
+            assert stockfish is pondering
+
+        async with pool.checkout() as stockfish:
+            assert not stockfish.is_pondering
+
+    asyncio.run(run())
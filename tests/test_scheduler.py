@@ -0,0 +1,104 @@
+import asyncio
+
+from app.util.fish.scheduler import EngineBusyError, EngineScheduler
+from app.util.metrics import stage_duration
+
+QUEUE_WAIT_SAMPLE = (
+    'chess_stage_duration_seconds_sum{strategy_name="unknown",stage="engine_queue"}'
+)
+
+
+def test_freed_slots_are_shared_by_weight() -> None:
+    async def run() -> None:
+        scheduler = EngineScheduler(
+            max_concurrent=1,
+            queue_size=10,
+            queue_timeout=1,
+            tier_weights={10: 2, 1000: 1},
+        )
+        finished: list[int] = []
+
+        async def search(movetime: int) -> None:
+            async with scheduler.admit(movetime=movetime):
+                finished.append(movetime)
+                await asyncio.sleep(0)
+
+        async with scheduler.admit(movetime=1000):
+            tasks = [
+                asyncio.create_task(search(movetime))
+                for movetime in [1000, 1000, 1000, 10, 10, 10, 10]
+            ]
+            await asyncio.sleep(0)
+
+        await asyncio.gather(*tasks)
+
+        assert finished == [10, 1000, 10, 10, 1000, 10, 1000]
+
+    asyncio.run(run())
+
+
+async def get_rejection(*, scheduler: EngineScheduler) -> EngineBusyError:
+    try:
+        async with scheduler.admit(movetime=100):
+            pass
+    except EngineBusyError as error:
+        return error
+
+    raise AssertionError("Request was admitted")
+
+
+def test_busy_engine_rejects_requests() -> None:
+    async def run() -> None:
+        scheduler = EngineScheduler(
+            max_concurrent=1,
+            queue_size=1,
+            queue_timeout=0.01,
+        )
+
+        async with scheduler.admit(movetime=100):
+            timeout_error = await get_rejection(scheduler=scheduler)
+
+            assert timeout_error.status_code == 503
+
+            waiting = asyncio.create_task(scheduler.admit(movetime=100).__aenter__())
+            await asyncio.sleep(0)
+
+            full_error = await get_rejection(scheduler=scheduler)
+
+            assert full_error.status_code == 429
+            assert full_error.retry_after >= 1
+
+            waiting.cancel()
+
+        async with scheduler.admit(movetime=100):
+            pass
+
+    asyncio.run(run())
+
+
+def get_queue_wait() -> float:
+    for sample in stage_duration.render_samples():
+        if sample.startswith(QUEUE_WAIT_SAMPLE):
+            return float(sample.split()[-1])
+
+    return 0
+
+
+def test_admission_wait_is_timed() -> None:
+    async def run() -> None:
+        scheduler = EngineScheduler(
+            max_concurrent=1,
+            queue_size=1,
+            queue_timeout=1,
+        )
+        queue_wait = get_queue_wait()
+
+        async with scheduler.admit(movetime=100):
+            waiting = asyncio.create_task(scheduler.admit(movetime=100).__aenter__())
+            await asyncio.sleep(0.1)
+
+        await waiting
+
+        assert get_queue_wait() - queue_wait >= 0.1
+
+    asyncio.run(run())
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from app.util.shared_cache import SharedCache
+
+
+def test_entries_are_shared_between_instances(tmp_path: Path) -> None:
+    path = str(tmp_path / "cache.sqlite3")
+    first_worker = SharedCache(path=path, ttl=None)
+    second_worker = SharedCache(path=path, ttl=None)
+
+    key = "k7/8/8/8/8/8/8/K7 w - -"
+
+    first_worker.set(namespace="stockfish-100", key=key, value="a1a2")
+
+    assert second_worker.get(namespace="stockfish-100", key=key) == "a1a2"
+    assert second_worker.get(namespace="stockfish-500", key=key) is None
+
+
+def test_expired_entry_is_a_miss(tmp_path: Path) -> None:
+    shared_cache = SharedCache(path=str(tmp_path / "cache.sqlite3"), ttl=-1)
+
+    shared_cache.set(namespace="checkmate-express", key="fen", value="e2e4")
+
+    assert shared_cache.get(namespace="checkmate-express", key="fen") is None
+
+
+def test_disabled_cache_stores_nothing() -> None:
+    shared_cache = SharedCache(path=None, ttl=None)
+
+    shared_cache.set(namespace="checkmate-express", key="fen", value="e2e4")
+
+    assert not shared_cache.is_enabled
+    assert shared_cache.get(namespace="checkmate-express", key="fen") is None
@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from app.util.speculation import speculative_moves
+from main import app
+
+
+def test_process_move_precomputes_bot_reply() -> None:
+    with TestClient(app) as client:
+        response = client.post(
+            "/process_move",
+            params={"speculate": True},
+            json={
+                "chess_move": {"from_square": "b2", "to_square": "b3"},
+                "strategy_request": {
+                    "fen_string": "k7/8/8/8/8/8/1R6/1R5K w - - 0 1",
+                    "strategy_name": "random-move",
+                },
+            },
+        )
+
+        assert response.status_code == 200
+
+        hits = speculative_moves.stats().hits
+        response = client.post(
+            "/compute_move",
+            json={
+                "fen_string": "k7/8/8/8/8/1R6/8/1R5K b - - 1 1",
+                "strategy_name": "random-move",
+            },
+        )
+
+        assert speculative_moves.stats().hits == hits + 1
+        assert response.json()["chess_move"] == {
+            "from_square": "a8",
+            "to_square": "a7",
+            "promotion": None,
+        }
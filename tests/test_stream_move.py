@@ -0,0 +1,90 @@
+import json
+
+from chess import Board
+from fastapi.testclient import TestClient
+from pytest import MonkeyPatch
+
+from app.route import chess as chess_route
+from app.util.fish import init_fish
+from app.util.schema import StrategyName
+from main import app
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+
+def parse_events(*, text: str) -> list[tuple[str, dict[str, object]]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        event_line, data_line = block.splitlines()
+        events.append(
+            (
+                event_line.removeprefix("event: "),
+                json.loads(data_line.removeprefix("data: ")),
+            )
+        )
+    return events
+
+
+def test_stream_move_reports_search_progress() -> None:
+    fen_string = "k7/8/8/8/8/8/1R6/1R5K w - - 0 1"
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/stream_move",
+            json={"fen_string": fen_string, "strategy_name": "stockfish-100"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    *progress, (event, move_outcome) = parse_events(text=response.text)
+
+    assert progress
+    assert all(event == "info" for event, _ in progress)
+    assert event == "move_outcome"
+
+    chess_move = move_outcome["chess_move"]
+    assert isinstance(chess_move, dict)
+    assert Board(fen=fen_string).is_legal(
+        Board(fen=fen_string).parse_uci(
+            f"{chess_move['from_square']}{chess_move['to_square']}"
+        )
+    )
+
+
+def test_stream_move_of_other_strategies() -> None:
+    with TestClient(app) as client:
+        response = client.post(
+            "/stream_move",
+            json={"fen_string": STARTING_FEN, "strategy_name": "random-move"},
+        )
+
+    [(event, move_outcome)] = parse_events(text=response.text)
+
+    assert event == "move_outcome"
+    assert move_outcome["chess_move"] is not None
+
+
+def test_stream_move_of_known_positions(monkeypatch: MonkeyPatch) -> None:
+    strategy_request = {
+        "fen_string": "k7/8/8/8/8/8/2R5/1R5K w - - 0 1",
+        "strategy_name": "stockfish-10",
+    }
+
+    def refuse_checkout(*, strategy_name: StrategyName, fen_string: str) -> None:
+        raise AssertionError(f"{strategy_name} took an engine for a known move")
+
+    with TestClient(app) as client:
+        searched = client.post("/stream_move", json=strategy_request)
+
+        monkeypatch.setattr(chess_route, "checkout_stockfish", refuse_checkout)
+        monkeypatch.setattr(init_fish, "checkout_stockfish", refuse_checkout)
+
+        cached = client.post("/stream_move", json=strategy_request)
+
+    *_, (_, searched_move_outcome) = parse_events(text=searched.text)
+    [(event, cached_move_outcome)] = parse_events(text=cached.text)
+
+    assert cached.status_code == 200
+    assert event == "move_outcome"
+    assert cached_move_outcome == searched_move_outcome
@@ -0,0 +1,181 @@
+import asyncio
+
+import pytest
+from chess import Board
+
+from app.util.fish.init_fish import init_stockfish
+from app.util.fish.uci import (
+    BestMove,
+    SearchInfo,
+    UciEngine,
+    UciError,
+    format_go_command,
+    parse_bestmove,
+    parse_info,
+)
+from app.util.schema import SearchLimit
+
+
+def test_parse_bestmove() -> None:
+    assert parse_bestmove(line="bestmove e2e4") == BestMove(move="e2e4", ponder=None)
+    assert parse_bestmove(line="bestmove e7e8q ponder d8e8") == BestMove(
+        move="e7e8q",
+        ponder="d8e8",
+    )
+    assert parse_bestmove(line="bestmove (none)") == BestMove(move=None, ponder=None)
+
+    with pytest.raises(UciError):
+        parse_bestmove(line="info depth 1")
+
+
+def test_parse_info() -> None:
+    assert parse_info(
+        line="info depth 12 seldepth 16 multipv 2 score cp -35 lowerbound nodes 9000"
+        " nps 900000 time 10 pv e7e5 g1f3"
+    ) == SearchInfo(
+        multipv=2,
+        depth=12,
+        score_cp=-35,
+        score_mate=None,
+        pv=("e7e5", "g1f3"),
+    )
+    assert parse_info(line="info depth 3 score mate 2 pv d1h5") == SearchInfo(
+        multipv=1,
+        depth=3,
+        score_cp=None,
+        score_mate=2,
+        pv=("d1h5",),
+    )
+    assert parse_info(line="info depth 1 currmove e2e4 currmovenumber 1") is None
+    assert parse_info(line="info string score pv are words too") is None
+
+    with pytest.raises(UciError):
+        parse_info(line="info depth 3 score cp pv d1h5")
+
+
+def test_format_go_command() -> None:
+    assert format_go_command(search_limit=SearchLimit(movetime=10)) == "go movetime 10"
+    assert (
+        format_go_command(search_limit=SearchLimit(movetime=100, nodes=1000))
+        == "go movetime 100 nodes 1000"
+    )
+    assert (
+        format_go_command(search_limit=SearchLimit(movetime=500, depth=10), ponder=True)
+        == "go ponder movetime 500 depth 10"
+    )
+
+
+def test_node_limited_search() -> None:
+    async def run() -> None:
+        stockfish = await init_stockfish()
+        board = Board()
+
+        best_move = await stockfish.search(
+            fen_string=board.fen(),
+            search_limit=SearchLimit(movetime=1000, nodes=1000),
+        )
+
+        assert best_move.move is not None
+        assert board.is_legal(board.parse_uci(best_move.move))
+
+        await stockfish.quit()
+
+    asyncio.run(run())
+
+
+def test_ponderhit_finishes_ponder_search() -> None:
+    async def run() -> None:
+        stockfish = await init_stockfish()
+        board = Board()
+
+        await stockfish.ponder(
+            fen_string=board.fen(),
+            best_move="e2e4",
+            ponder_move="e7e5",
+            search_limit=SearchLimit(movetime=50),
+            ponder_timeout=10,
+        )
+        board.push_uci("e2e4")
+        board.push_uci("e7e5")
+
+        assert stockfish.is_pondering_on(fen_string=board.fen())
+
+        best_move = await stockfish.search(
+            fen_string=board.fen(),
+            search_limit=SearchLimit(movetime=50),
+        )
+
+        assert best_move.move is not None
+        assert board.is_legal(board.parse_uci(best_move.move))
+        assert not stockfish.is_pondering
+
+        await stockfish.quit()
+
+    asyncio.run(run())
+
+
+def test_unanswered_ponder_search_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    stopped_engines: list[UciEngine] = []
+    stop = UciEngine.stop
+
+    def spy_stop(stockfish: UciEngine) -> None:
+        stopped_engines.append(stockfish)
+        stop(stockfish)
+
+    monkeypatch.setattr(UciEngine, "stop", spy_stop)
+
+    async def run() -> None:
+        stockfish = await init_stockfish()
+        board = Board()
+
+        await stockfish.ponder(
+            fen_string=board.fen(),
+            best_move="e2e4",
+            ponder_move="e7e5",
+            search_limit=SearchLimit(movetime=50),
+            ponder_timeout=0.05,
+        )
+
+        assert not stopped_engines
+        await asyncio.sleep(0.2)
+
+        assert not stockfish.is_pondering
+        assert stopped_engines == [stockfish]
+
+        best_move = await stockfish.search(
+            fen_string=board.fen(),
+            search_limit=SearchLimit(movetime=10),
+        )
+
+        assert best_move.move is not None
+        assert board.is_legal(board.parse_uci(best_move.move))
+
+        await stockfish.quit()
+
+    asyncio.run(run())
+
+
+def test_abandoned_analysis_frees_the_engine() -> None:
+    async def run() -> None:
+        stockfish = await init_stockfish()
+        board = Board()
+
+        search_updates = stockfish.analyze(
+            fen_string=board.fen(),
+            search_limit=SearchLimit(movetime=1000),
+            multipv=2,
+        )
+        assert isinstance(await anext(search_updates), SearchInfo)
+        await search_updates.aclose()
+
+        best_move = await stockfish.search(
+            fen_string=board.fen(),
+            search_limit=SearchLimit(movetime=10),
+        )
+
+        assert best_move.move is not None
+        assert board.is_legal(board.parse_uci(best_move.move))
+
+        await stockfish.quit()
+
+    asyncio.run(run())